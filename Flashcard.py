@@ -1,29 +1,111 @@
-import csv, os, shutil, heapq
-import random
+import csv, os, shutil, heapq, math, re, bisect, mmap, struct, sqlite3, itertools, threading, contextlib, operator
+import locale, gc, sys, glob, io, zipfile, tarfile
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None #CardStore falls back to array.array
 from datetime import datetime as dt
 
 class HashTable():
-    def __init__(self,size):
-        self.size = size
+    def __init__(self,size=8,load_factor=0.7,min_load_factor=0.2):
+        """
+        An open addressing hash table with linear probing that grows and shrinks to keep probes short
+
+        Parameters:
+        size (int): The starting number of slots, the table never shrinks below this
+        load_factor (float): The fraction of used slots (cards and deleted markers) that triggers a rehash
+        min_load_factor (float): The fraction of slots holding cards below which the table shrinks
+
+        Returns:
+        None
+        """
+        self.size = max(1, size)
+        self.min_size = self.size
+        self.load_factor = load_factor
+        self.min_load_factor = min_load_factor
         self.table = [None] * self.size
         self.deleted = "deleted"
+        self.count = 0 #slots holding a card
+        self.tombstones = 0 #slots marked as deleted
+
+    def __len__(self):
+        return self.count
 
     def hashFunction(self,key):
         return abs(hash(key)) % self.size
 
+    def resize(self,new_size):
+        """
+        Rehashes every card into a table of a new size, deleted markers are dropped along the way
+
+        Parameters:
+        new_size (int): The number of slots in the new table
+
+        Returns:
+        None
+        """
+        old_table = self.table
+        self.size = max(self.min_size, new_size)
+        self.table = [None] * self.size
+        self.count = 0
+        self.tombstones = 0
+        for slot in old_table:
+            if slot is not None and slot != self.deleted:
+                index = self.hashFunction(slot[0])
+                while self.table[index] is not None:
+                    index = (index + 1) % self.size
+                self.table[index] = slot
+                self.count += 1
+
     def insert(self,key,card):
+        #grow before the table gets crowded, if most of the crowding is deleted markers just rehash in place
+        if (self.count + self.tombstones + 1) > self.size * self.load_factor:
+            if (self.count + 1) > self.size * self.load_factor / 2:
+                self.resize(self.size * 2)
+            else:
+                self.resize(self.size)
+
         #hash key to find index
         index = self.hashFunction(key)
-        count = 0
-
-        #check is hashed index free? if so then we put key,value there
-        while count < self.size:
-            if self.table[index] is None or self.table[index] == self.deleted or self.table[index][0] == key:
+        first_deleted = None
+
+        #keep probing past deleted spots so an existing key further along gets replaced instead of duplicated
+        while self.table[index] is not None:
+            if self.table[index] == self.deleted:
+                if first_deleted is None:
+                    first_deleted = index
+            elif self.table[index][0] == key:
                 self.table[index] = (key,card)
                 return
             #if not linear probe keep checking the next index for a spot wrap around if nessasary
             index = (index + 1) % self.size
-            count += 1
+
+        if first_deleted is not None:
+            index = first_deleted
+            self.tombstones -= 1
+        self.table[index] = (key,card)
+        self.count += 1
+
+    def insertMany(self,items):
+        """
+        Inserts many cards, the table grows once to its final size up front instead of doubling as it fills
+
+        Parameters:
+        items (iterable): (key, card) pairs
+
+        Returns:
+        None
+        """
+        items = list(items)
+        size = self.size
+        while (self.count + self.tombstones + len(items) + 1) > size * self.load_factor:
+            size *= 2
+        if size != self.size:
+            self.resize(size)
+        for key, card in items:
+            self.insert(key, card)
 
     def get(self,key):
         #hash out initial index
@@ -49,33 +131,653 @@ class HashTable():
             if self.table[index] != self.deleted and self.table[index][0] == key:
                 poppedValue = self.table[index]
                 self.table[index] = self.deleted
+                self.count -= 1
+                self.tombstones += 1
+                #shrink once the table is mostly empty, this also clears out the deleted markers
+                if self.size > self.min_size and self.count < self.size * self.min_load_factor:
+                    self.resize(self.size // 2)
                 return poppedValue
             index = (index + 1) % self.size
             count += 1
         return None
 
+class ArrayHashTable(HashTable):
+    EMPTY = -1
+    DELETED = -2
+
+    def __init__(self,size=8,load_factor=0.7,min_load_factor=0.2):
+        """
+        A hash table with the same interface as HashTable but stored as parallel arrays instead of (key,card) tuples.
+        Each slot keeps the key's cached hash in an array so probes compare hashes before comparing strings
+
+        Parameters:
+        size (int): The starting number of slots, the table never shrinks below this
+        load_factor (float): The fraction of used slots (cards and deleted markers) that triggers a rehash
+        min_load_factor (float): The fraction of slots holding cards below which the table shrinks
+
+        Returns:
+        None
+        """
+        super().__init__(size,load_factor,min_load_factor)
+        self.table = None
+        self.allocate(self.size)
+
+    def allocate(self,size):
+        self.hashes = array("q",[self.EMPTY]) * size #EMPTY, DELETED or the key's hash
+        self.keys = [None] * size
+        self.cards = [None] * size
+
+    def keyHash(self,key):
+        #mask to a positive number so it never collides with the EMPTY/DELETED markers
+        return hash(key) & 0x3FFFFFFFFFFFFFFF
+
+    def resize(self,new_size):
+        old_hashes, old_keys, old_cards = self.hashes, self.keys, self.cards
+        self.size = max(self.min_size, new_size)
+        self.allocate(self.size)
+        self.count = 0
+        self.tombstones = 0
+        hashes = self.hashes
+        for n, h in enumerate(old_hashes):
+            if h >= 0:
+                #the cached hash means the key never has to be hashed again
+                index = h % self.size
+                while hashes[index] != self.EMPTY:
+                    index = (index + 1) % self.size
+                hashes[index] = h
+                self.keys[index] = old_keys[n]
+                self.cards[index] = old_cards[n]
+                self.count += 1
+
+    def findSlot(self,key,h):
+        #returns the index holding key, or None. Locals keep the probe loop cheap
+        hashes, keys, size, empty = self.hashes, self.keys, self.size, self.EMPTY
+        index = h % size
+        count = 0
+        while count < size:
+            slot = hashes[index]
+            if slot == empty:
+                return None
+            if slot == h and keys[index] == key:
+                return index
+            index = (index + 1) % size
+            count += 1
+        return None
+
+    def insert(self,key,card):
+        if (self.count + self.tombstones + 1) > self.size * self.load_factor:
+            if (self.count + 1) > self.size * self.load_factor / 2:
+                self.resize(self.size * 2)
+            else:
+                self.resize(self.size)
+
+        h = self.keyHash(key)
+        hashes, keys, size, empty, deleted = self.hashes, self.keys, self.size, self.EMPTY, self.DELETED
+        index = h % size
+        first_deleted = None
+        slot = hashes[index]
+        while slot != empty:
+            if slot == deleted:
+                if first_deleted is None:
+                    first_deleted = index
+            elif slot == h and keys[index] == key:
+                self.cards[index] = card
+                return
+            index = (index + 1) % size
+            slot = hashes[index]
+
+        if first_deleted is not None:
+            index = first_deleted
+            self.tombstones -= 1
+        hashes[index] = h
+        self.keys[index] = key
+        self.cards[index] = card
+        self.count += 1
+
+    def get(self,key):
+        index = self.findSlot(key,self.keyHash(key))
+        if index is None:
+            return None
+        return self.keys[index],self.cards[index]
+
+    def delete(self,key):
+        index = self.findSlot(key,self.keyHash(key))
+        if index is None:
+            return None
+        poppedValue = (self.keys[index],self.cards[index])
+        self.hashes[index] = self.DELETED
+        self.keys[index] = None
+        self.cards[index] = None
+        self.count -= 1
+        self.tombstones += 1
+        if self.size > self.min_size and self.count < self.size * self.min_load_factor:
+            self.resize(self.size // 2)
+        return poppedValue
+
 class PriorityQueue:
-    def __init__(self):
-        self.heap = []
+    def __init__(self,key=None):
+        """
+        A min heap that knows where every item is, so an item's priority can be changed or the item removed in
+        O(log n) instead of pushing it again and leaving the old entry behind. Items with the same priority come out
+        in the order they were queued
+
+        Parameters:
+        key (function): Gives the key an item is looked up by, defaults to the item itself
+
+        Returns:
+        None
+        """
+        self.heap = [] #(priority, order queued, key, data)
+        self.position = {} #key -> index in heap
+        self.key = key if key is not None else (lambda data: data)
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self,key):
+        return key in self.position
 
     def isEmpty(self):
         return len(self.heap) == 0
 
     def enqueue(self,priority, data):
-        heapq.heappush(self.heap,(priority,data))
+        key = self.key(data)
+        if key in self.position:
+            self.updatePriority(key, priority, data)
+            return
+        self.heap.append((priority, next(self.counter), key, data))
+        self.position[key] = len(self.heap) - 1
+        self.siftUp(len(self.heap) - 1)
+
+    def enqueueMany(self,items):
+        #adding everything then heapifying once is O(n) instead of O(n log n) pushes
+        if self.heap:
+            for priority, data in items:
+                self.enqueue(priority, data)
+            return
+        entries = {}
+        for priority, data in items:
+            key = self.key(data)
+            entries[key] = (priority, next(self.counter), key, data) #a repeated item keeps its last priority
+        self.heap = list(entries.values())
+        heapq.heapify(self.heap)
+        self.position = {entry[2]: index for index, entry in enumerate(self.heap)}
+
+    def peek(self):
+        if self.heap:
+            return self.heap[0][3]
 
     def dequeue(self):
         if self.heap:
-            return heapq.heappop(self.heap)[1]
+            return self.remove(self.heap[0][2])
+
+    def remove(self,key):
+        """
+        Takes an item out of the queue wherever it is
+
+        Parameters:
+        key: The item's key
+
+        Returns:
+        The item, None if it wasn't queued
+        """
+        index = self.position.pop(key, None)
+        if index is None:
+            return None
+        entry = self.heap[index]
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.position[last[2]] = index
+            self.siftDown(self.siftUp(index))
+        return entry[3]
+
+    def updatePriority(self,key,priority,data=None):
+        """
+        Changes the priority of a queued item, it goes behind items already queued with the same priority
+
+        Parameters:
+        key: The item's key
+        priority: The new priority
+        data: Replaces the item if given
+
+        Returns:
+        None
+        """
+        index = self.position[key]
+        old = self.heap[index]
+        self.heap[index] = (priority, next(self.counter), key, old[3] if data is None else data)
+        self.siftDown(self.siftUp(index))
+
+    def siftUp(self,index):
+        #moves an entry towards the root until its parent is smaller, returns where it ended up
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            self.position[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        self.position[entry[2]] = index
+        return index
+
+    def siftDown(self,index):
+        heap = self.heap
+        entry = heap[index]
+        end = len(heap)
+        while True:
+            child = 2 * index + 1
+            if child >= end:
+                break
+            if child + 1 < end and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            self.position[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        self.position[entry[2]] = index
+        return index
+
+class InvertedIndex:
+    def __init__(self):
+        """
+        A full text index that maps every word in a card's question and answer to the rows of the cards containing it
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.postings = {} #token -> {row: times the token appears in that card}
+        self.docs = {} #row -> (card, tokens) so a card can be removed without knowing its old text
+
+    def __len__(self):
+        return len(self.docs)
+
+    @staticmethod
+    def tokenize(text):
+        return re.findall(r"\w+", text.casefold())
+
+    def addCard(self,card):
+        """
+        Adds a card's question and answer words to the index
+
+        Parameters:
+        card (Card): The card to index
+
+        Returns:
+        None
+        """
+        if card.row in self.docs:
+            self.removeCard(card)
+        tokens = self.tokenize(card.question) + self.tokenize(card.answer)
+        self.docs[card.row] = (card, tokens)
+        for token in tokens:
+            posting = self.postings.setdefault(token, {})
+            posting[card.row] = posting.get(card.row, 0) + 1
+
+    def removeCard(self,card):
+        """
+        Removes a card from the index using the words it was indexed with
+
+        Parameters:
+        card (Card): The card to remove
+
+        Returns:
+        None
+        """
+        doc = self.docs.pop(card.row, None)
+        if doc is None:
+            return
+        for token in set(doc[1]):
+            posting = self.postings[token]
+            del posting[card.row]
+            if not posting:
+                del self.postings[token]
+
+    def updateCard(self,card):
+        """
+        Reindexes a card after its question or answer changed
+
+        Parameters:
+        card (Card): The edited card
+
+        Returns:
+        None
+        """
+        self.removeCard(card)
+        self.addCard(card)
+
+    def search(self,query,match_all=True,limit=10):
+        """
+        Finds the cards containing the words in a query ranked by tf-idf
+
+        Parameters:
+        query (str): The words to search for
+        match_all (bool): True if a card must contain every word (AND), False if any word is enough (OR)
+        limit (int): The max number of cards to return, None for all of them
+
+        Returns:
+        arr: The matching cards, best match first
+        """
+        terms = set(self.tokenize(query))
+        if not terms:
+            return []
+        postings = [self.postings.get(term, {}) for term in terms]
+        if match_all:
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            #only the rows in the shortest posting list can match every word
+            rows = [row for row in postings[0] if all(row in p for p in postings[1:])]
+        else:
+            rows = set()
+            for posting in postings:
+                rows.update(posting)
+
+        total = len(self.docs)
+        weights = [(posting, math.log(1 + total / len(posting))) for posting in postings if posting]
+        scores = {row: sum(posting.get(row, 0) * idf for posting, idf in weights) for row in rows}
+        if limit is None:
+            ranked = sorted(scores, key=scores.get, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores, key=scores.get)
+        return [self.docs[row][0] for row in ranked]
+
+class PrefixIndex:
+    def __init__(self,cards=()):
+        """
+        A sorted array of lowercased questions searched with bisect, used to autocomplete questions
+
+        Parameters:
+        cards (arr): Cards to start the index with, they are sorted once instead of inserted one at a time
+
+        Returns:
+        None
+        """
+        self.cards = {card.row: card for card in cards} #row -> card
+        self.keys = sorted((card.question.lower(), card.row) for card in self.cards.values())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def addCard(self,card):
+        self.cards[card.row] = card
+        bisect.insort(self.keys, (card.question.lower(), card.row))
+
+    def removeCard(self,card,question=None):
+        """
+        Removes a card from the index
+
+        Parameters:
+        card (Card): The card to remove
+        question (str): The question the card was indexed under if it has changed since
+
+        Returns:
+        None
+        """
+        key = ((question if question is not None else card.question).lower(), card.row)
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.keys[index]
+            self.cards.pop(card.row, None)
+
+    def updateCard(self,card,old_question):
+        self.removeCard(card, old_question)
+        self.addCard(card)
+
+    def complete(self,prefix,k=10):
+        """
+        Finds the first k questions in alphabetical order that start with a prefix
+
+        Parameters:
+        prefix (str): What the user has typed so far
+        k (int): The max number of completions
+
+        Returns:
+        arr: Up to k cards whose question starts with the prefix
+        """
+        prefix = prefix.lower()
+        index = bisect.bisect_left(self.keys, (prefix,))
+        found = []
+        while index < len(self.keys) and len(found) < k and self.keys[index][0].startswith(prefix):
+            found.append(self.cards[self.keys[index][1]])
+            index += 1
+        return found
+
+class TrigramIndex:
+    def __init__(self):
+        """
+        A fuzzy question index. Questions are split into 3 letter pieces (trigrams) so cards sharing enough of them with a
+        typo'd search can be found without comparing the search to every card
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.postings = {} #trigram -> set of rows
+        self.docs = {} #row -> (card, normalized question, trigrams)
+
+    def __len__(self):
+        return len(self.docs)
+
+    @staticmethod
+    def normalize(text):
+        #ignore case and punctuation so 'Who wrote "Romeo and Juliet"?' matches who wrote romeo and juliet
+        return " ".join(re.findall(r"\w+", text.casefold()))
+
+    @staticmethod
+    def trigrams(text):
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def addCard(self,card):
+        if card.row in self.docs:
+            self.removeCard(card)
+        text = self.normalize(card.question)
+        grams = self.trigrams(text)
+        self.docs[card.row] = (card, text, grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(card.row)
+
+    def removeCard(self,card):
+        doc = self.docs.pop(card.row, None)
+        if doc is None:
+            return
+        for gram in doc[2]:
+            rows = self.postings[gram]
+            rows.discard(card.row)
+            if not rows:
+                del self.postings[gram]
+
+    def updateCard(self,card):
+        self.removeCard(card)
+        self.addCard(card)
+
+    def search(self,query,k=5,max_distance=None):
+        """
+        Finds the questions closest to a search that may have typos
+
+        Parameters:
+        query (str): The question to search for
+        k (int): The max number of cards to return
+        max_distance (int): The most edits (insert, delete or change a letter) a match can be from the search,
+        defaults to a fifth of the search's length but no more than 4
+
+        Returns:
+        arr: Up to k (distance, card) pairs, closest first
+        """
+        text = self.normalize(query)
+        if not text:
+            return []
+        if max_distance is None:
+            max_distance = max(1, min(4, len(text) // 5))
+        grams = sorted(self.trigrams(text), key=lambda gram: len(self.postings.get(gram, ())))
+
+        #each edit can break at most 3 trigrams, so a match has to share at least this many. That also means a match
+        #must contain one of the rarest len(grams) - needed + 1 trigrams, so only those are used to find candidates
+        needed = max(1, len(grams) - 3 * max_distance)
+        probe = len(grams) - needed + 1
+        shared = {}
+        for gram in grams[:probe]:
+            for row in self.postings.get(gram, ()):
+                shared[row] = shared.get(row, 0) + 1
+        for gram in grams[probe:]:
+            rows = self.postings.get(gram, ())
+            for row in shared:
+                if row in rows:
+                    shared[row] += 1
+        candidates = sorted((row for row, count in shared.items() if count >= needed), key=shared.get, reverse=True)
+
+        found = []
+        for row in candidates:
+            #candidates sharing fewer trigrams can't be closer than this, so stop once it passes the limit
+            if (len(grams) - shared[row] + 2) // 3 > max_distance:
+                break
+            card, other, other_grams = self.docs[row]
+            distance = editDistance(text, other, max_distance)
+            if distance <= max_distance:
+                heapq.heappush(found, (-distance, -row, card))
+                if len(found) > k:
+                    heapq.heappop(found)
+                    max_distance = -found[0][0]
+        return [(-d, card) for d, row, card in sorted(found, reverse=True)]
+
+class SortedView:
+    def __init__(self,field,cards=(),collation="casefold",load=512):
+        """
+        A deck's cards kept in order of one field. The (key, row) pairs are split into sorted blocks of at most
+        2 * load pairs, so adding or removing a card bisects to its block and only shifts that block
+
+        Parameters:
+        field (str): "question", "answer" or "date"
+        cards (arr): Cards to start the view with, they are sorted once instead of inserted one at a time
+        collation (str): How question and answer text is compared, a key of sortCollations
+        load (int): Half the largest block size
+
+        Returns:
+        None
+        """
+        if field not in ("question", "answer", "date"):
+            raise ValueError(f"Can not sort cards by {field}")
+        self.field = field
+        self.collation = collation
+        self.load = load
+        self.cards = {} #row -> card
+        self.keys = {} #row -> key the card is filed under, so an edited card can be found without its old value
+        for card in cards:
+            self.cards[card.row] = card
+            self.keys[card.row] = self.sortKey(card)
+        pairs = sorted((key, row) for row, key in self.keys.items())
+        self.blocks = [pairs[i:i + load] for i in range(0, len(pairs), load)]
+        self.maxes = [block[-1] for block in self.blocks]
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        for block in self.blocks:
+            for key, row in block:
+                yield self.cards[row]
+
+    def __reversed__(self):
+        for block in reversed(self.blocks):
+            for key, row in reversed(block):
+                yield self.cards[row]
+
+    def sortKey(self,card):
+        if self.field == "date":
+            return dateKey(card.date)
+        fold = sortCollations[self.collation]
+        text = getattr(card, self.field)
+        return text if fold is None else fold(text)
+
+    def addCard(self,card):
+        if card.row in self.cards:
+            self.removeCard(card)
+        key = self.sortKey(card)
+        self.cards[card.row] = card
+        self.keys[card.row] = key
+        pair = (key, card.row)
+        if not self.blocks:
+            self.blocks.append([pair])
+            self.maxes.append(pair)
+            return
+        index = min(bisect.bisect_left(self.maxes, pair), len(self.blocks) - 1)
+        block = self.blocks[index]
+        bisect.insort(block, pair)
+        self.maxes[index] = block[-1]
+        if len(block) > 2 * self.load:
+            self.blocks.insert(index + 1, block[self.load:])
+            del block[self.load:]
+            self.maxes.insert(index, block[-1])
+
+    def removeCard(self,card):
+        if card.row not in self.cards:
+            return
+        pair = (self.keys.pop(card.row), card.row)
+        del self.cards[card.row]
+        index = bisect.bisect_left(self.maxes, pair)
+        block = self.blocks[index]
+        del block[bisect.bisect_left(block, pair)]
+        if block:
+            self.maxes[index] = block[-1]
+        else:
+            del self.blocks[index]
+            del self.maxes[index]
+
+    def updateCard(self,card):
+        if self.keys.get(card.row) != self.sortKey(card):
+            self.addCard(card)
+
+    def between(self,low,high):
+        """
+        Finds the cards whose key is between two keys
+
+        Parameters:
+        low: The smallest key to include
+        high: The largest key to include
+
+        Returns:
+        arr: The cards in order
+        """
+        found = []
+        index = bisect.bisect_left(self.maxes, (low,))
+        start = bisect.bisect_left(self.blocks[index], (low,)) if index < len(self.blocks) else 0
+        while index < len(self.blocks):
+            for key, row in itertools.islice(self.blocks[index], start, None):
+                if key > high:
+                    return found
+                found.append(self.cards[row])
+            start = 0
+            index += 1
+        return found
 
 class Deck:
-    def __init__(self,path):
+    #what extractDeck builds for the selected deck, kept together in the DeckPool when another deck is selected
+    DECK_STATE = ("deck", "loaded_name", "study_deck", "hash_table", "word_index", "prefix_index", "fuzzy_index",
+                  "sorted_views", "store", "review_log", "next_row", "loaded_version")
+
+    def __init__(self,path,compact_index=False,storage=None,max_cards=None,pool_bytes=0):
         """
         A basic deck class where the user can make decks, select a deck to use, study the selected deck, edit the selected deck,
         export selected deck, and import other decks
 
         Parameters:
         path (str): A string representing the directory where the decks are stored
+        compact_index (bool): Use ArrayHashTable instead of HashTable for the question index, it uses less memory on large decks
+        storage (CsvStorage or SqliteStorage): Where the decks are kept, defaults to csv files in path
+        max_cards (int): The most cards a deck can have, None for no limit
+        pool_bytes (int): The memory decks that were switched away from may keep using, see DeckPool
 
         Returns:
         None
@@ -85,6 +787,20 @@ class Deck:
         self.deckName = None
         self.study_deck = DeckSchedule()
         self.hash_table = None
+        self.compact_index = compact_index
+        self.word_index = None
+        self.prefix_index = None
+        self.fuzzy_index = None
+        self.sorted_views = {} #(field, collation) -> SortedView, built the first time the deck is sorted that way
+        self.store = None #CardStore holding the selected deck's scheduling numbers
+        self.review_log = None #ReviewLog of every answer given to the selected deck
+        self.binary_deck = None
+        self.storage = storage if storage is not None else CsvStorage(path)
+        self.next_row = 1 #row the next added card gets
+        self.max_cards = max_cards
+        self.loaded_name = None #the name of the deck in self.deck, selectDeck changes deckName before it is loaded
+        self.loaded_version = None #the storage's deckVersion when the deck in self.deck was loaded
+        self.pool = DeckPool(pool_bytes, lambda deckName: self.storage.flushDeck(deckName))
 
     def makeDeck(self):
         """
@@ -97,8 +813,7 @@ class Deck:
         None
         """
         deck = []
-        deck.append(["question", "answer", "date_created"])  # header for the csv
-        existingDecks = os.listdir(self.path)
+        existingDecks = set(self.storage.listDecks())
         while True:
             deckName = input("Name of the deck:\n")
 
@@ -119,9 +834,9 @@ class Deck:
         card = self.makeCard()
         deck.append(card)
 
-        while len(deck) < 101:
-            if len(deck) == 101:
-                print("You have reached the maximum limit of 100 cards in this deck.")
+        while True:
+            if self.max_cards is not None and len(deck) >= self.max_cards:
+                print(f"You have reached the maximum limit of {self.max_cards} cards in this deck.")
                 break
 
             choice = input("Do you want to add more cards?\n1): Yes:\n2): No:\n")
@@ -134,9 +849,7 @@ class Deck:
             else:
                 print("Invalid Input! Please enter '1' for Yes or '2' for No.")
 
-        with open(self.path + "\\" + deckName + ".csv", "w", newline='') as f:
-            w = csv.writer(f)
-            w.writerows(deck)
+        self.storage.writeDeck(deckName + ".csv", (Card(*card, row) for row, card in enumerate(deck, 1)))
 
     def makeCard(self):
         """
@@ -167,106 +880,383 @@ class Deck:
         card.append(now)
         return card
 
-    def extractDeck(self):
+    def extractDeck(self,reuse=True):
         """
-        Extracts all information from the selected deck
+        Extracts all information from the selected deck. A deck still in the pool is taken back out of it instead of
+        loaded again, and the deck loaded before is put in the pool once the new one has loaded. If the new deck can not
+        be loaded the deck loaded before stays selected
 
         Parameters:
-        None:
+        reuse (bool): False loads the deck from storage even if it is in the pool or already loaded
 
         Returns:
-        deck: (arr): An array where the data from a csv is stored
+        deck: (arr): An array where the data from a csv is stored, None if it could not be loaded
         """
-        try:
-            deck = []
-            with open(self.path + self.deckName, "r") as text:
-                csv = text.readlines()
-                for n, line in enumerate(csv, 0):
-                    line = line.replace("\n", "")
-                    line = line.split(",")
-                    card = Card(line[0], line[1], line[2], n)
-                    deck.append(card)
-                    self.study_deck.addCard(card)
-            deck.pop(0) #remove header
-            self.deck = deck
-            self.hash_table = HashTable(100)
-            for card in self.deck:
-                self.hash_table.insert(card.question.lower(), card)
+        if self.deckName is None:
+            return None #no deck was selected
+        if reuse and self.deck is not None and self.deckName == self.loaded_name:
+            return self.deck
+        version = self.storage.deckVersion(self.deckName)
+        state = self.pool.take(self.deckName, version)
+        if state is not None and reuse:
+            self.parkDeck()
+            for name, value in state.items():
+                setattr(self, name, value)
             return self.deck
+        with collectionPaused():
+            try:
+                errors = []
+                deck = list(self.storage.loadCards(self.deckName, errors))
+                schedule = self.storage.loadSchedule(self.deckName)
+                review_log = ReviewLog(self.reviewLogPath())
+                #without a saved schedule (lost, or the deck came with only its history) it is rebuilt from the log
+                reviews = review_log.read() if not schedule else None
+            except (OSError, UnicodeDecodeError, csv.Error, sqlite3.Error, ValueError) as e:
+                print(f"An error occurred: {e}")
+                self.deckName = self.loaded_name #changes keep going to the deck that is still loaded
+                return
+            if self.deckName != self.loaded_name:
+                self.parkDeck()
+            self.loaded_name = self.deckName
+            self.loaded_version = version
+            return self.buildDeck(deck, schedule, review_log, reviews, errors)
 
-        except:
-            print("An error occurred")
+    def buildDeck(self,deck,schedule,review_log,reviews=None,errors=()):
+        """
+        Makes the question index, card store and study queue of a deck that has been read
 
-    def selectDeck(self):
+        Parameters:
+        deck (arr): The deck's cards
+        schedule (dict): The deck's saved scheduling numbers, see CsvStorage.loadSchedule
+        review_log (ReviewLog): The deck's review log
+        reviews (dict): The log's answers if the schedule is to be rebuilt from them, see ReviewLog.read
+        errors (arr): (line number, message) pairs for the rows that were skipped
+
+        Returns:
+        deck: (arr): The cards of the deck
         """
-        Returns a string of the decks name that the user chose, if valid
+        for line, message in errors:
+            print(f"Skipped line {line}: {message}")
+        hash_table = ArrayHashTable() if self.compact_index else HashTable()
+        hash_table.insertMany((card.question.lower(), card) for card in deck)
+        self.deck = deck
+        self.store = CardStore(len(deck))
+        self.store.addCards(deck)
+        self.store.applySchedule(schedule)
+        self.study_deck = DeckSchedule()
+        self.review_log = review_log
+        if reviews is not None and self.store.replayReviews(reviews, self.study_deck.scheduler):
+            self.storage.updateSchedule(self.loaded_name, self.store.scheduleEntries())
+        self.study_deck.addCards(self.store.cards, self.store.column("due").tolist())
+        self.hash_table = hash_table
+        #the search indexes are only built the first time they are used, most sessions never need them
+        self.word_index = None
+        self.fuzzy_index = None
+        self.prefix_index = None
+        self.sorted_views = {}
+        self.next_row = max((card.row for card in self.deck), default=0) + 1
+        return self.deck
+
+    def parkDeck(self):
+        """
+        Puts the loaded deck in the deck pool with how much memory it uses. The search indexes that are only built when
+        they are used are left out, they are built again if the deck is used again
 
         Parameters:
         None
 
         Returns:
-        str: A string of the deck name the user chose
+        None
         """
-        existingDecks = os.listdir(self.path)
-        if not existingDecks:
-            print("There are no decks to select!\nYou can make decks at the main menu")
+        if self.deck is None or not self.pool.budget:
             return
+        self.word_index = self.prefix_index = self.fuzzy_index = None
+        self.sorted_views = {}
+        version = self.storage.deckVersion(self.loaded_name)
+        state = {name: getattr(self, name) for name in self.DECK_STATE}
+        #a deck whose files changed since it was loaded is flushed once it leaves the pool
+        self.pool.put(self.loaded_name, state, self.deckBytes(), version, version != self.loaded_version)
+
+    def deckBytes(self):
+        """
+        Measures the memory the loaded deck uses. Lists, arrays and dicts are measured whole, the cards and what each
+        card adds to the question index and study queue are measured on a sample of up to 1000 cards
 
-        else:
-            while True:
-                print("Select a deck:")
-                for idx, d in enumerate(existingDecks, 1):
-                    print(f"{idx}): {d[:-4]}")
-                deck_choice = input("")
-                if deck_choice.isnumeric() and 1 <= int(deck_choice) <= len(existingDecks):
-                    selectedDeck = existingDecks[int(deck_choice) - 1]
-                    self.deckName = selectedDeck
-                    return self.deckName
-                else:
-                    print("\nEnter a existing deck!")
+        Parameters:
+        None
 
-    def importDeck(self):
+        Returns:
+        int: The number of bytes
         """
-        Allows user to import a deck, if valid
+        if not self.deck:
+            return 0
+        size = sys.getsizeof
+        containers = [self.deck, self.study_deck.priority_deck.heap, self.study_deck.priority_deck.position]
+        containers += list(self.store.columns.values()) + [self.store.cards]
+        containers += [value for value in vars(self.hash_table).values() if isinstance(value, (list, array))]
+        sample = self.deck[::max(1, len(self.deck) // 1000)]
+        card_bytes = sum(size(card) + size(card.question) + size(card.answer) + size(card.date) + size(card.row)
+                         + size(card.question.lower()) + (size(card.deck) if card.deck else 0) for card in sample)
+        #the queue's (due, order, row, card) entry and the numbers in it, and HashTable's (key, card) pair
+        entry_bytes = size((0.0, 0, 0, None)) + size(0.0) + size(len(self.deck))
+        if self.hash_table.table is not None:
+            entry_bytes += size((None, None))
+        return sum(map(size, containers)) + round(len(self.deck) * (card_bytes / len(sample) + entry_bytes))
+
+    def loadDecks(self,deckNames=None,processes=None):
+        """
+        Loads many decks at once. Csv decks are parsed in a pool of processes that send each deck back as lists of its
+        fields instead of Card objects, the cards, question index and study queue are then made here
 
         Parameters:
-        None
+        deckNames (arr): The names of the decks to load, defaults to every deck
+        processes (int): How many processes parse decks, defaults to the number of cores
 
         Returns:
-        None
+        dict: deck name -> Deck with that deck extracted, decks that could not be read are left out
         """
-        deckImport = input("Enter the path to the deck you want to import:\n")
-        try:
-            if not os.path.exists(deckImport):
-                print("File not found")
-                return
+        if deckNames is None:
+            deckNames = self.storage.listDecks()
+        decks = {}
+        if not isinstance(self.storage, CsvStorage) or len(deckNames) < 2:
+            #SQLite already reads without parsing and one deck has nothing to share the work with
+            for deckName in deckNames:
+                deck = Deck(self.path, self.compact_index, self.storage, self.max_cards)
+                deck.deckName = deckName
+                if deck.extractDeck() is not None:
+                    decks[deckName] = deck
+            return decks
+
+        self.storage.waitForCompaction()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parsed = [(deckName, pool.submit(parseDeckFile, self.storage.path, deckName)) for deckName in deckNames]
+            for deckName, future in parsed:
+                try:
+                    questions, answers, dates, rows, deck_fields, schedule, errors = future.result()
+                    deck = Deck(self.path, self.compact_index, self.storage, self.max_cards)
+                    deck.deckName = deck.loaded_name = deckName
+                    deck.loaded_version = self.storage.deckVersion(deckName)
+                    review_log = ReviewLog(deck.reviewLogPath())
+                    reviews = review_log.read() if not schedule else None
+                except (OSError, UnicodeDecodeError, csv.Error, ValueError) as e:
+                    print(f"An error occurred loading {deckName[:-4]}: {e}")
+                    continue
+                if deck_fields is None:
+                    deck_fields = itertools.repeat(None)
+                with collectionPaused():
+                    cards = list(map(Card, questions, answers, dates, rows, deck_fields))
+                    deck.buildDeck(cards, schedule, review_log, reviews, errors)
+                decks[deckName] = deck
+        return decks
+
+    def reviewLogPath(self,deckName=None):
+        return os.path.join(self.path, (deckName or self.deckName) + ".reviews")
+
+    def getWordIndex(self):
+        if self.word_index is None:
+            self.word_index = InvertedIndex()
+            for card in self.deck:
+                self.word_index.addCard(card)
+        return self.word_index
 
-            with open(deckImport, "r") as f:
-                text = f.read().strip()
-                if text.partition("\n")[0] != "question,answer,date_created":
-                    print("Invalid file!")
-                    return
-                f.close()
-                filename = os.path.basename(deckImport)
-                destinationPath = os.path.join(self.path, filename)
-                os.rename(deckImport, destinationPath)
-                print("Deck imported successfully")
+    def getPrefixIndex(self):
+        if self.prefix_index is None:
+            self.prefix_index = PrefixIndex(self.deck)
+        return self.prefix_index
 
-        except Exception as e:
-            print(e)
+    def getFuzzyIndex(self):
+        if self.fuzzy_index is None:
+            self.fuzzy_index = TrigramIndex()
+            for card in self.deck:
+                self.fuzzy_index.addCard(card)
+        return self.fuzzy_index
 
-    def exportDeck(self):
+    def getSortedView(self,field,collation=None):
+        collation = collation or sortCollation
+        if (field, collation) not in self.sorted_views:
+            self.sorted_views[(field, collation)] = SortedView(field, self.deck, collation)
+        return self.sorted_views[(field, collation)]
+
+    def rescheduleDeck(self,scheduler=None):
         """
-        Allows user to export existing decks, if valid
+        Works out every card's due time again after the scheduler's settings changed, saves them and rebuilds the
+        study queue in one go instead of moving the cards one at a time
 
         Parameters:
-        None
+        scheduler (SM2Scheduler): The scheduler with the new settings, defaults to the current one
 
         Returns:
         None
         """
-        cur_name = self.deckName
-        selectedDeck = self.selectDeck()
+        if self.store is None:
+            return
+        scheduler = scheduler if scheduler is not None else self.study_deck.scheduler
+        self.store.reschedule(scheduler)
+        self.study_deck = DeckSchedule(scheduler)
+        self.study_deck.addCards(self.store.cards, self.store.column("due").tolist())
+        self.storage.updateSchedule(self.loaded_name, self.store.scheduleEntries())
+
+    def printStatistics(self):
+        """
+        Prints how many cards the selected deck has, how many are due and its average scheduling numbers
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.store is None:
+            return
+        stats = self.store.statistics(dt.now().timestamp())
+        print(f"{stats['cards']} cards, {stats['due']} due for review")
+        if stats["cards"]:
+            print(f"Average interval: {stats['mean_interval']:.1f} days, average ease: {stats['mean_ease']:.2f}, "
+                  f"lapses: {stats['lapses']}")
+        if stats["oldest"] is not None:
+            print(f"Created between {dt.fromtimestamp(stats['oldest'])} and {dt.fromtimestamp(stats['newest'])}")
+
+    def openBinaryDeck(self,name):
+        """
+        Opens a binary deck (see csvToBinary) from the deck directory. Nothing is parsed up front, cards are read from
+        the memory mapped file when they are accessed by index. This is for code that reads big decks, a binary deck
+        is read only and is not one of the decks the menu selects, studies or edits
+
+        Parameters:
+        name (str): The file name of the binary deck
+
+        Returns:
+        BinaryDeck: The opened deck, None if it could not be opened
+        """
+        if self.binary_deck is not None:
+            self.binary_deck.close()
+            self.binary_deck = None
+        try:
+            self.binary_deck = BinaryDeck(os.path.join(self.path, name))
+        except (OSError, ValueError, struct.error) as e:
+            print(f"An error occurred: {e}")
+        return self.binary_deck
+
+    def selectDeck(self):
+        """
+        Returns a string of the decks name that the user chose, if valid
+
+        Parameters:
+        None
+
+        Returns:
+        str: A string of the deck name the user chose
+        """
+        existingDecks = list(self.storage.deckInfo().values())
+        if not existingDecks:
+            print("There are no decks to select!\nYou can make decks at the main menu")
+            return
+
+        else:
+            while True:
+                print("Select a deck:")
+                for idx, d in enumerate(existingDecks, 1):
+                    if d.get("columns") == 0:
+                        print(f"{idx}): {d['name'][:-4]} (can not be read)")
+                    else:
+                        print(f"{idx}): {d['name'][:-4]} ({d['cards']} cards, {d['due']} due)")
+                deck_choice = input("")
+                if deck_choice.isnumeric() and 1 <= int(deck_choice) <= len(existingDecks):
+                    selectedDeck = existingDecks[int(deck_choice) - 1]["name"]
+                    self.deckName = selectedDeck
+                    return self.deckName
+                else:
+                    print("\nEnter a existing deck!")
+
+    def importDeck(self):
+        """
+        Allows user to import decks from a csv file, a directory, a glob pattern like *.csv or a zip or tar archive.
+        The files are copied and checked as they are read, and a line is printed for every file
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        deckImport = input("Enter the path to the deck, folder or archive you want to import:\n")
+        report = self.importDecks(deckImport)
+        if not report:
+            print("No decks found")
+        for source, deckName, cards, skipped, error in report:
+            if error is not None:
+                print(f"Not imported {source}: {error}")
+                continue
+            line = f"Imported {source} as {deckName[:-4]}, {cards} cards"
+            if skipped:
+                line += f", skipped {len(skipped)} rows (line {skipped[0][0]}: {skipped[0][1]})"
+            print(line)
+
+    def importDecks(self,pattern,processes=None):
+        """
+        Imports every csv deck found at a path, see findDeckSources. A deck gets the name of its file, with a number
+        added if a deck already has that name. Csv decks are imported in a pool of processes, each one importing a
+        run of the files. The numbers are given out again once every file is done, so a file that failed does not
+        use one up
+
+        Parameters:
+        pattern (str): A csv file, a directory, a glob pattern or a zip or tar archive
+        processes (int): How many processes import decks, defaults to the number of cores
+
+        Returns:
+        arr: (source, deck name, cards imported, skipped rows, error message) for every file, the error message is
+        None for a file that was imported
+        """
+        try:
+            sources = findDeckSources(pattern)
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+            return [(pattern, None, 0, [], str(e))]
+        existing = {deckName.lower() for deckName in self.storage.listDecks()}
+        taken = set(existing)
+        items = [(source, member, uniqueDeckName(name, taken)) for source, member, name in sources]
+
+        if isinstance(self.storage, CsvStorage) and len(items) > 1:
+            workers = processes or os.cpu_count() or 1
+            size = -(-len(items) // (4 * workers)) #a few runs per process so a slow one does not hold up the rest
+            runs = [items[start:start + size] for start in range(0, len(items), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(itertools.chain.from_iterable(pool.map(importDeckFiles,
+                                                                      itertools.repeat(self.storage.path), runs)))
+        else:
+            #SQLite has one connection to write through
+            results = importCards(self.storage, items)
+
+        report = []
+        taken = existing
+        for (source, member, name), item, (cards, skipped, error) in zip(sources, items, results):
+            deckName = item[2]
+            if error is None:
+                #every name before the one the deck was imported as was taken or went to a file that failed
+                final = uniqueDeckName(name, taken)
+                if final != deckName:
+                    try:
+                        self.storage.renameDeck(deckName, final)
+                    except (OSError, sqlite3.Error):
+                        taken.discard(final.lower())
+                        taken.add(deckName.lower())
+                        final = deckName
+                deckName = final
+            report.append((source if member is None else f"{source}:{member}", None if error else deckName, cards,
+                           skipped, error))
+        return report
+
+    def exportDeck(self):
+        """
+        Allows user to export existing decks, if valid
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        cur_name = self.deckName
+        selectedDeck = self.selectDeck()
         self.deckName = cur_name # resets deck name to original one
 
         try:
@@ -275,7 +1265,7 @@ class Deck:
                 print(f"'{deckExport}' is not a valid directory.")
                 return
 
-            shutil.copy(self.path + '\\' + selectedDeck, deckExport)
+            self.storage.exportDeck(selectedDeck, deckExport)
             print("Successful")
 
         except Exception as e:
@@ -283,7 +1273,8 @@ class Deck:
 
     def studyDeck(self):
         """
-        A function where the user could study cards from the selected deck. The frequency of cards appearing is based on their review time
+        A function where the user could study the cards of the selected deck that are due. How soon a card is due again
+        depends on the answers given to it, see SM2Scheduler, and is saved right away
 
         Parameters:c
         None
@@ -296,37 +1287,164 @@ class Deck:
             return
 
         deck_copy = self.study_deck
-        if deck_copy.priority_deck.heap:
-            deck_copy.priority_deck.dequeue()#remove the header if heap is not empty
-
-        while not deck_copy.priority_deck.isEmpty():
-            card_to_review = deck_copy.priority_deck.heap[0][1]
-            if card_to_review:
-                print("Question:")
-                print(card_to_review.question)
-                input("\nPress enter to see the answer")
-                print("\nAnswer:")
-                print(card_to_review.answer, "\n")
-
-                while True:
-                    choice = input("1): Again, 2): Hard, 3): Good, or 4): Remove Card")
-                    if choice == '1':
-                        self.study_deck.removeCard()
-                        deck_copy.updateReviewTime(card_to_review, 1)
-                        break
-                    elif choice == '2':
-                        deck_copy.updateReviewTime(card_to_review, 5)
-                        deck_copy.removeCard()
-                        break
-                    elif choice == '3':
-                        deck_copy.updateReviewTime(card_to_review, 10)
-                        deck_copy.removeCard()
-                        break
-                    elif choice == "4":
-                        deck_copy.removeCard()
-                        break
-                    else:
-                        print("Invalid Input!")
+
+        while True:
+            card_to_review = deck_copy.nextCard(dt.now().timestamp())
+            if card_to_review is None:
+                upcoming = deck_copy.priority_deck.peek()
+                if upcoming is None:
+                    print("There are no cards left to study")
+                else:
+                    print(f"No more cards are due, the next one is due {dt.fromtimestamp(upcoming.due):%Y-%m-%d %H:%M}")
+                break
+            grade = self.askGrade(card_to_review)
+            if grade is None:
+                deck_copy.removeCard(card_to_review)
+                continue
+            previous = card_to_review.interval
+            deck_copy.reviewCard(card_to_review, grade, dt.now().timestamp())
+            self.saveReview(self.loaded_name, card_to_review, deck_copy.scheduler.GRADES[grade], previous, self.review_log)
+
+    def studyAllDecks(self):
+        """
+        A function where the user could study the due cards of every deck in one session, the card that has been due the
+        longest in any deck comes first, see CrossDeckSchedule. Answers are saved to the card's own deck right away
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        session = CrossDeckSchedule(self.storage, dt.now().timestamp())
+        for deckName, message in session.errors:
+            print(f"Skipped {deckName[:-4]}: {message}")
+        review_logs = {} #deck name -> ReviewLog, opened the first time a card of the deck is answered
+
+        while True:
+            found = session.nextCard(dt.now().timestamp())
+            if found is None:
+                upcoming = session.nextDue()
+                if upcoming is None:
+                    print("There are no cards due in any deck")
+                else:
+                    print(f"No more cards are due, the next one is due {dt.fromtimestamp(upcoming):%Y-%m-%d %H:%M}")
+                break
+            deckName, card = found
+            print(f"Deck: {deckName[:-4]}")
+            grade = self.askGrade(card)
+            if grade is None:
+                session.removeCard(card)
+                continue
+            previous = card.interval
+            session.reviewCard(deckName, card, grade, dt.now().timestamp())
+            if deckName not in review_logs:
+                review_logs[deckName] = ReviewLog(self.reviewLogPath(deckName))
+            self.saveReview(deckName, card, session.scheduler.GRADES[grade], previous, review_logs[deckName])
+
+        for deckName in review_logs:
+            self.pool.discard(deckName)
+        if self.deck is not None and self.loaded_name in review_logs:
+            #the selected deck was studied through cards of its own, load it again so it has the new schedule
+            self.extractDeck(reuse=False)
+
+    def askGrade(self,card):
+        """
+        Shows a card's question, then its answer once the user is ready, and asks how well it was remembered
+
+        Parameters:
+        card (Card): The card to ask
+
+        Returns:
+        str: "again", "hard" or "good", None if the card is to be removed from the session
+        """
+        grades = {"1": "again", "2": "hard", "3": "good"}
+        print("Question:")
+        print(card.question)
+        input("\nPress enter to see the answer")
+        print("\nAnswer:")
+        print(card.answer, "\n")
+
+        while True:
+            choice = input("1): Again, 2): Hard, 3): Good, or 4): Remove Card")
+            if choice in grades:
+                return grades[choice]
+            elif choice == "4":
+                return None
+            else:
+                print("Invalid Input!")
+
+    def saveReview(self,deckName,card,quality,previous,review_log):
+        #saves an answered card's new schedule and adds the answer to its deck's review log
+        self.storage.updateSchedule(deckName, [scheduleEntry(card)])
+        review_log.append(card.row, card.reviewed, quality, previous, card.interval, card.ease)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Keeps every card change made inside a with block in memory and saves them together in one atomic write when
+        the block ends. If the block fails nothing is saved and the deck is reloaded
+
+        Parameters:
+        None
+
+        Returns:
+        BatchStorage: The storage collecting the changes
+        """
+        if isinstance(self.storage, BatchStorage):
+            yield self.storage #already in a batch, the outer one saves everything
+            return
+        batch = BatchStorage(self.storage)
+        self.storage = batch
+        try:
+            yield batch
+        except BaseException:
+            batch.rollback()
+            self.storage = batch.storage
+            if self.loaded_name is not None:
+                self.extractDeck(reuse=False)
+            raise
+        self.storage = batch.storage
+        batch.commit()
+
+    def sortDeck(self,keys,collation=None):
+        """
+        Sorts the selected deck by one or more card fields. A single field is read off its sorted view,
+        which is kept up to date as cards change so sorting that way again costs no comparisons
+
+        Parameters:
+        keys (str or arr): The fields to sort by, see sortCards
+        collation (str): How text is compared, see sortCollations. None uses sortCollation
+
+        Returns:
+        None
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        if len(keys) == 1:
+            view = self.getSortedView(keys[0].lstrip("-"), collation)
+            #ties are in row order, descending lists them last row first
+            self.deck = list(reversed(view)) if keys[0].startswith("-") else list(view)
+        else:
+            sortCards(self.deck, keys, collation or sortCollation)
+
+    def cardsBetween(self,start,end):
+        """
+        Finds the cards created between two dates
+
+        Parameters:
+        start (str): The earliest date, "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS"
+        end (str): The latest date, a day without a time includes the whole day
+
+        Returns:
+        arr: The cards from oldest to newest
+        """
+        if len(end.strip()) == 10:
+            end = end.strip() + " 23:59:59"
+        low, high = dateKey(start.strip()), dateKey(end)
+        if low == float("-inf") or high == float("-inf"):
+            raise ValueError("Dates must look like YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+        return self.getSortedView("date").between(low, high)
 
     def printDeck(self):
         """
@@ -336,27 +1454,157 @@ class Deck:
         None
 
         Returns:
-        None
+        Card: The card that was edited, None if the user went back
+        str: The question of the card before it was edited
         """
+        start = 0
         while True:
-            printCards(self.deck)
+            printCards(self.deck, start, pageSize)
+            if len(self.deck) > pageSize:
+                print("n): Next page, p): Previous page")
             cardEdit = input("Select a card to edit:")
-            if cardEdit.isnumeric() and int(cardEdit) == len(self.deck) + 1:
+            if cardEdit.lower() == "n":
+                if start + pageSize < len(self.deck):
+                    start += pageSize
+            elif cardEdit.lower() == "p":
+                start = max(0, start - pageSize)
+            elif cardEdit.isnumeric() and int(cardEdit) == len(self.deck) + 1:
                 return None
 
             elif cardEdit.isnumeric() and 0 <= int(cardEdit) - 1 < len(self.deck):
                 cardEditIndex = int(cardEdit) - 1
-                question_data = self.deck[cardEditIndex].askCard(self.path, self.deckName)
+                card = self.deck[cardEditIndex]
+                question_data = card.askCard(self.storage, self.loaded_name)
                 if question_data:
                     question, old_question = question_data
-                    return question,old_question
+                    return card,old_question
+            else:
+                print("Invalid input!")
+
+    def indexCard(self,card):
+        """
+        Adds a new card to the card store, the question, word, prefix and fuzzy indexes and the sorted views
+
+        Parameters:
+        card (Card): The card to add
+
+        Returns:
+        None
+        """
+        self.store.addCard(card)
+        self.hash_table.insert(card.question.lower(),card)
+        #indexes that haven't been built yet will pick the card up when they are
+        if self.word_index is not None:
+            self.word_index.addCard(card)
+        if self.prefix_index is not None:
+            self.prefix_index.addCard(card)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.addCard(card)
+        for view in self.sorted_views.values():
+            view.addCard(card)
+
+    def reindexCard(self,card,old_question):
+        """
+        Updates the question, word, prefix and fuzzy indexes and the sorted views after a card was edited
+
+        Parameters:
+        card (Card): The edited card
+        old_question (str): The question of the card before it was edited
+
+        Returns:
+        None
+        """
+        if card.question != old_question:
+            self.hash_table.delete(old_question.lower())
+            self.hash_table.insert(card.question.lower(),card)
+            if self.prefix_index is not None:
+                self.prefix_index.updateCard(card, old_question)
+            if self.fuzzy_index is not None:
+                self.fuzzy_index.updateCard(card)
+        if self.word_index is not None:
+            self.word_index.updateCard(card)
+        for view in self.sorted_views.values():
+            view.updateCard(card)
+
+    def autocompleteCard(self):
+        """
+        Lets the user narrow down a question by typing its start, showing the matching questions after each entry
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        prefix = ""
+        while True:
+            prefix += input(f"Keep typing the question (enter nothing to go back):\n{prefix}")
+            if prefix == "":
+                return
+            matches = self.getPrefixIndex().complete(prefix)
+            if not matches:
+                print("No questions start with that")
+                prefix = ""
+                continue
+            for n, card in enumerate(matches, 1):
+                print(f"{n}): {card.question}")
+            pick = input("Select a card, or press enter to keep typing:")
+            if pick.isnumeric() and 0 <= int(pick) - 1 < len(matches):
+                self.editFoundCard(matches[int(pick) - 1])
+                return
+
+    def editFoundCard(self,card):
+        """
+        Asks the user if they want to edit a card found by a search and edits it if so
+
+        Parameters:
+        card (Card): The card that was found
+
+        Returns:
+        None
+        """
+        while True:
+            print(f"\nFound, edit the card? "
+                  f"Card): Question):{card.question} Answer): {card.answer} Date Created): {card.date}"
+                  "\n1): Yes"
+                  "\n2): No")
+            search_card_edit = input("Select an option:")
+            if search_card_edit == "1":
+                new_question, old_question = card.editCard(self.storage, self.loaded_name)
+                self.reindexCard(card, old_question)
+            elif search_card_edit == "2":
+                break
+            else:
+                print("Invalid Input!")
+
+    def pickCard(self,cards):
+        """
+        Prints a list of cards found by a search and lets the user pick one to edit
+
+        Parameters:
+        cards (arr): The cards to pick from
+
+        Returns:
+        None
+        """
+        if not cards:
+            print("Card not found")
+            return
+        while True:
+            printCards(cards)
+            pick = input("Select a card:")
+            if pick.isnumeric() and int(pick) == len(cards) + 1:
+                return
+            elif pick.isnumeric() and 0 <= int(pick) - 1 < len(cards):
+                self.editFoundCard(cards[int(pick) - 1])
+                return
             else:
                 print("Invalid input!")
 
     def editDeck(self):
         """
         A function where the user can edit specific cards, add cards to the selected deck, sort cards by date
-        created, answer, or question, or search for a specific card
+        created, answer, or question, or search for a specific card. Changes are saved as each option is done
 
         Parameters:
         None
@@ -381,98 +1629,159 @@ class Deck:
             if choice == "5":
                 break
 
-            if choice == "1":
-                if self.printDeck():
-                    question,old_question = self.printDeck()
-                    if question != old_question:
-                        card = self.hash_table.get(old_question)[1]
-                        self.hash_table.delete(old_question.lower())
-                        self.hash_table.insert(question.lower(),card)
+            #the changes made in an option are saved in one write when it is done, a short journal append for a few
+            with self.batch():
+                if choice == "1":
+                    edited = self.printDeck()
+                    if edited:
+                        card,old_question = edited
+                        self.reindexCard(card, old_question)
                         print("Card successfully edited")
 
-            elif choice == "2":
-                while True:
-                    print("Sort by what?"
-                          "\n1): Answer alphabetically"
-                          "\n2): Question alphabetically"
-                          "\n3): Last Created"
-                          "\n4): Back"
-                          )
-                    edit = input("Select an option:")
-                    if edit == "4":
-                        break  # break from loop
-                    elif edit == "1":
-                        self.deck = quickSort(self.deck, 0, len(self.deck) - 1, "answer")
-                        print("Deck sorted by answer.")
-                        break
-                    elif edit == "2":
-                        self.deck = quickSort(self.deck, 0, len(self.deck) - 1, "question")
-                        print("Deck sorted by question.")
-                        break
-                    elif edit == "3":
-                        self.deck = quickSort(self.deck, 0, len(self.deck) - 1, "date")
-                        print("Deck sorted by date.")
-                        break
-                    else:
-                        print("Invalid Input!")
-
-            elif choice == "3":
-                while True:
-                    print("Search by what?"
-                          "\n1): Question"
-                          "\n2): Back"
-                          )
-                    edit = input("Select an option:")
-                    if edit == "2":
-                        break  # break from loop
-
-
-                    elif edit == "1":
-                        question = input("Enter question to search for:")
-                        found_card = self.hash_table.get(question.lower())
-                        if found_card:
-                            card = found_card[1]
-                            while True:
-                                print(f"\nFound, edit the card? "
-                                      f"Card): Question):{card.question} Answer): {card.answer} Date Created): {card.date}"
-                                      "\n1): Yes"
-                                      "\n2): No")
-                                search_card_edit = input("Select an option:")
-                                if search_card_edit == "1":
-                                    new_question, old_question = card.editCard(self.path, self.deckName)
-                                    if new_question != old_question:
-                                        self.hash_table.delete(old_question.lower())
-                                        self.hash_table.insert(new_question.lower(),card)
-                                elif search_card_edit == "2":
-                                    break
-                                else:
-                                    print("Invalid Input!")
+                elif choice == "2":
+                    while True:
+                        print("Sort by what?"
+                              "\n1): Answer alphabetically"
+                              "\n2): Question alphabetically"
+                              "\n3): Last Created"
+                              "\n4): Several fields"
+                              "\n5): Back"
+                              )
+                        edit = input("Select an option:")
+                        if edit == "5":
+                            break  # break from loop
+                        elif edit == "1":
+                            self.sortDeck("answer")
+                            print("Deck sorted by answer.")
+                            break
+                        elif edit == "2":
+                            self.sortDeck("question")
+                            print("Deck sorted by question.")
+                            break
+                        elif edit == "3":
+                            self.sortDeck("date")
+                            print("Deck sorted by date.")
+                            break
+                        elif edit == "4":
+                            fields = input("Fields in order, - for descending (e.g. answer,-date): ")
+                            keys = [field.strip().lower() for field in fields.split(",") if field.strip()]
+                            try:
+                                self.sortDeck(keys)
+                            except ValueError as e:
+                                print(e)
+                                continue
+                            print(f"Deck sorted by {', '.join(keys)}.")
+                            break
                         else:
-                            print("Card not found")
+                            print("Invalid Input!")
+
+                elif choice == "3":
+                    while True:
+                        print("Search by what?"
+                              "\n1): Question"
+                              "\n2): Words (all of them)"
+                              "\n3): Words (any of them)"
+                              "\n4): Question (autocomplete)"
+                              "\n5): Question (allow typos)"
+                              "\n6): Date created (between two dates)"
+                              "\n7): Back"
+                              )
+                        edit = input("Select an option:")
+                        if edit == "7":
+                            break  # break from loop
+
+
+                        elif edit == "1":
+                            question = input("Enter question to search for:")
+                            found_card = self.hash_table.get(question.lower())
+                            if found_card:
+                                self.editFoundCard(found_card[1])
+                            else:
+                                print("Card not found")
+
+                        elif edit == "2" or edit == "3":
+                            words = input("Enter words to search for in questions and answers:")
+                            self.pickCard(self.getWordIndex().search(words, match_all=(edit == "2")))
+
+                        elif edit == "4":
+                            self.autocompleteCard()
+
+                        elif edit == "5":
+                            question = input("Enter question to search for:")
+                            self.pickCard([card for distance, card in self.getFuzzyIndex().search(question)])
+
+                        elif edit == "6":
+                            start = input("Created on or after (YYYY-MM-DD):")
+                            end = input("Created on or before (YYYY-MM-DD):")
+                            try:
+                                self.pickCard(self.cardsBetween(start, end))
+                            except ValueError as e:
+                                print(e)
 
-                    else:
-                        print("Invalid Input!")
+                        else:
+                            print("Invalid Input!")
+
+                elif choice == "4":
+                    if self.max_cards is not None and len(self.deck) >= self.max_cards:
+                        print(f"You reached the max amount of cards in a deck.\nA deck cannot have more than {self.max_cards} cards!")
+                        continue
+                    card_list = self.makeCard()
+                    #decks with a deck column give the new card the same value as the cards already in it
+                    deck_value = self.deck[0].deck if self.deck else None
+                    card = Card(card_list[0],card_list[1],card_list[2],self.next_row,deck_value)
+                    self.next_row += 1
+                    self.deck.append(card)
+                    self.study_deck.addCard(card)
+                    self.indexCard(card)
+                    self.storage.addCard(self.loaded_name, card)
+                    print("Card added")
 
-            elif choice == "4":
-                if len(self.deck) > 100:
-                    print("You reached the max amount of cards in a deck.\nA deck cannot have more than 100 cards!")
-                    return
-                card_list = self.makeCard()
-                card = Card(card_list[0],card_list[1],card_list[2],len(self.deck)+1)
-                self.deck.append(card)
-                self.study_deck.addCard(card)
-                self.hash_table.insert(card.question.lower(),card)
-                with open(self.path + "\\" + self.deckName, "a", newline='') as f:
-                    w = csv.writer(f)
-                    w.writerow(card_list)
-                print("Card added")
 
+                else:
+                    print("Invalid input!")
 
-            else:
-                print("Invalid input!")
+class CardColumn:
+    def __init__(self,default):
+        """
+        A card attribute kept in its deck's CardStore instead of on the card. A card that isn't in a store reads the
+        default and gets a store of its own the first time it is set
+
+        Parameters:
+        default: The value a card starts with
+
+        Returns:
+        None
+        """
+        self.default = default
+
+    def __set_name__(self,owner,name):
+        self.name = name
+
+    def __get__(self,card,owner=None):
+        if card is None:
+            return self
+        store = card.store
+        if store is None:
+            return self.default
+        return store.readers[self.name](card.index)
+
+    def __set__(self,card,value):
+        if card.store is None:
+            CardStore(1).addCard(card)
+        card.store.columns[self.name][card.index] = value
 
 class Card:
-    def __init__(self,question,answer,date,row_number):
+    __slots__ = ("question", "answer", "date", "row", "deck", "store", "index") #no per card __dict__, matters on big decks
+
+    #the scheduling numbers live in the deck's CardStore, see CardColumn and SM2Scheduler
+    due = CardColumn(0.0) #seconds since the epoch, 0 means due now
+    interval = CardColumn(0.0) #days between the last review and the due date
+    ease = CardColumn(2.5)
+    repetitions = CardColumn(0) #correct answers in a row
+    lapses = CardColumn(0) #times the card was forgotten after it was learned
+    reviewed = CardColumn(0.0) #when the card was last answered, 0 if it never was
+
+    def __init__(self,question,answer,date,row_number,deck=None):
         """
         A basic card class that makes each card in a deck a card
 
@@ -481,6 +1790,7 @@ class Card:
         answer (str): The answer to a card
         date (str): The date the cards was created on
         row_number (int): A number that shows which row a card is stored in the csv
+        deck (str): The optional deck column some csv files have
 
         Returns:
         str: The question of a card
@@ -491,7 +1801,9 @@ class Card:
         self.answer = answer
         self.date = date
         self.row = row_number
-        self.review_time = 1 #default review time
+        self.deck = deck
+        self.store = None
+        self.index = None
 
     def __lt__(self, other):
         """
@@ -501,9 +1813,9 @@ class Card:
         other (Card): A card class to compare with
 
         Return
-        bool: True if card's review_timme is less than the other card's review_time, and False otherwise
+        bool: True if card is due before the other card, and False otherwise
         """
-        return self.review_time < other.review_time
+        return self.due < other.due
 
     def displayQuestion(self):
         return self.question
@@ -514,12 +1826,12 @@ class Card:
     def displayDateCreated(self):
         return self.date
 
-    def askCard(self,path,deckName):
+    def askCard(self,storage,deckName):
         """
         A function that prints a menu where the user can edit a card or exit the menu
 
         Parameters:
-        path (str): A string representing the directory where the decks are stored
+        storage (CsvStorage or SqliteStorage): Where the selected deck is stored
         deckName (str): The name of the selected deck
 
         Returns:
@@ -536,26 +1848,25 @@ class Card:
             if edit == "2":
                 break  # break go back
             elif edit == "1":  # edits question
-                question,old_question = self.editCard(path,deckName)
+                question,old_question = self.editCard(storage,deckName)
                 return question,old_question
             else:
                 print("Invalid input!")
 
-    def editCard(self,path,deckName):
+    def editCard(self,storage,deckName):
         """
-        A function where the user can edit a cards question or answer
+        A function where the user can edit a cards question or answer, the card is saved once after both are asked
 
         Parameters:
-        path (str): A string representing the directory where the decks are stored
+        storage (CsvStorage or SqliteStorage): Where the selected deck is stored
         deckName (str): The name of the selected deck
 
         Return:
-        None
+        str: The question of the card after editing
+        str: The question of the card before editing
         """
         old_question = self.question
-        with open(path + "\\" + deckName, "r", newline="") as f:
-            reader = csv.reader(f)
-            rows = list(reader)  # store rows for editing
+        old_answer = self.answer
         while True:
             print("Old Question:")
             print(self.question)
@@ -563,12 +1874,7 @@ class Card:
                            "\n2): Skip")
             if choice == "1":
                 newQuestion = input("\nWhat is the new question:")
-                rows[self.row][0] = newQuestion
-                with open(path + "\\" + deckName, "w", newline='') as f:
-                    w = csv.writer(f)
-                    w.writerows(rows) # write new question
-                    self.question = newQuestion
-
+                self.question = newQuestion
 
             elif choice == "2":
                 break
@@ -582,138 +1888,2184 @@ class Card:
                            "\n2): Skip")
             if choice == "1":
                 newAnswer = input("\nWhat is the new answer:")
-                rows[self.row][1] = newAnswer
-                with open(path + "\\" + deckName, "w", newline='') as f:
-                    w = csv.writer(f)
-                    w.writerows(rows)# write new answer
-                    self.answer = newAnswer
+                self.answer = newAnswer
             elif choice == "2":
                 break
 
             else:
                 print("Invalid Input!")
+        if self.question != old_question or self.answer != old_answer:
+            storage.updateCard(deckName, self) # one write for both edits
         return self.question,old_question
 
-class DeckSchedule:
-    def __init__(self):
+class CardStore:
+    COLUMNS = {"row": "q", "created": "d", "due": "d", "interval": "d", "ease": "d", "repetitions": "q",
+               "lapses": "q", "reviewed": "d"} #name -> typecode
+
+    def __init__(self,capacity=1024):
         """
-        Initializes a deck to be studied as a Priority Queue
+        The numbers of a deck's cards kept column by column, so questions about the whole deck (what is due, averages)
+        are answered with one pass over an array instead of reading every Card. The columns are NumPy arrays when numpy
+        is installed and array.array otherwise, the question and answer text stays on the cards
 
         Parameters:
+        capacity (int): How many cards the NumPy columns have room for before they grow
+
+        Returns:
         None
+        """
+        self.size = 0
+        self.cards = [] #index -> card
+        if numpy is not None:
+            self.columns = {name: numpy.zeros(max(1, capacity), dtype=code) for name, code in self.COLUMNS.items()}
+        else:
+            self.columns = {name: array(code) for name, code in self.COLUMNS.items()}
+        self.findReaders()
+
+    def __len__(self):
+        return self.size
+
+    def findReaders(self):
+        #name -> function reading one card's value as a plain python number, numpy's indexing returns numpy scalars
+        self.readers = {name: column.item if numpy is not None else column.__getitem__
+                        for name, column in self.columns.items()}
+
+    def column(self,name):
+        """
+        Gets one column for every card in the store
+
+        Parameters:
+        name (str): A key of COLUMNS
+
+        Returns:
+        numpy.ndarray or array: The column, index i belongs to self.cards[i]
+        """
+        column = self.columns[name]
+        return column[:self.size] if numpy is not None else column
+
+    def addCards(self,cards):
+        """
+        Moves cards into the store, a card that was in another store brings its numbers along
+
+        Parameters:
+        cards (arr): The cards to add
 
         Returns:
         None
         """
-        self.priority_deck = PriorityQueue()
+        cards = [card for card in cards if card.store is not self]
+        if not cards:
+            return
+        names = [name for name in self.COLUMNS if isinstance(getattr(Card, name, None), CardColumn)]
+        if all(card.store is None for card in cards):
+            #new cards all start on the defaults, no need to read them one at a time
+            values = {name: [getattr(Card, name).default] * len(cards) for name in names}
+        else:
+            values = {name: [getattr(card, name) for card in cards] for name in names}
+        values["row"] = [card.row for card in cards]
+        values["created"] = [dateKey(card.date) for card in cards]
+        if numpy is not None:
+            needed = self.size + len(cards)
+            if needed > len(self.columns["row"]):
+                capacity = max(needed, 2 * len(self.columns["row"]))
+                for name, column in self.columns.items():
+                    grown = numpy.zeros(capacity, dtype=column.dtype)
+                    grown[:self.size] = column[:self.size]
+                    self.columns[name] = grown
+                self.findReaders()
+            for name, column in self.columns.items():
+                column[self.size:needed] = values[name]
+        else:
+            for name, column in self.columns.items():
+                column.extend(values[name])
+        for index, card in enumerate(cards, self.size):
+            card.store = self
+            card.index = index
+        self.cards.extend(cards)
+        self.size += len(cards)
 
     def addCard(self,card):
+        self.addCards([card])
+
+    def applySchedule(self,schedule):
         """
-        Adds a card with a priority number and their info to the priority queue
+        Sets the scheduling numbers saved for a deck's cards
 
         Parameters:
-        card (Card): The card to be added to the priority queue
+        schedule (dict): row -> (due, interval, ease, repetitions, lapses, reviewed), see scheduleHeader
 
         Returns:
         None
         """
-        priority = card.review_time
-        self.priority_deck.enqueue(priority,card)
+        if not schedule:
+            return
+        index_of = {card.row: index for index, card in enumerate(self.cards)}
+        columns = [self.columns[name] for name in scheduleHeader[1:]]
+        for row, values in schedule.items():
+            index = index_of.get(row)
+            if index is not None:
+                for column, value in zip(columns, values):
+                    column[index] = value
+
+    def gather(self,names,indexes=None):
+        """
+        Reads some columns for some of the cards
 
-    def removeCard(self):
+        Parameters:
+        names (arr): Keys of COLUMNS
+        indexes (arr): Store indexes of the cards, None for every card
+
+        Returns:
+        dict: name -> the column's values for those cards
+        """
+        if indexes is None:
+            return {name: self.column(name) for name in names}
+        if numpy is not None:
+            indexes = numpy.asarray(indexes, dtype="q")
+            return {name: self.column(name)[indexes] for name in names}
+        return {name: [self.columns[name][index] for index in indexes] for name in names}
+
+    def scatter(self,values,indexes=None):
         """
-        Removes a card if it is over review date
+        Writes some columns for some of the cards
 
         Parameters:
-        None
+        values (dict): name -> the column's new values for those cards
+        indexes (arr): Store indexes of the cards, None for every card
 
         Returns:
         None
         """
-        self.priority_deck.dequeue()
+        for name, column_values in values.items():
+            column = self.columns[name]
+            if numpy is not None:
+                if indexes is None:
+                    column[:self.size] = column_values
+                else:
+                    column[numpy.asarray(indexes, dtype="q")] = column_values
+            elif indexes is None:
+                column[:] = array(self.COLUMNS[name], column_values)
+            else:
+                for index, value in zip(indexes, column_values):
+                    column[index] = value
 
-    def updateReviewTime(self,card,time):
+    def reviewCards(self,scheduler,indexes,quality,now):
         """
-        Updates a card review time based on if the user knows/does not know the card for more frequent review
+        Answers many cards at once, see SM2Scheduler.reviewMany
 
         Parameters:
-        card (Card): The card to edit
-        time (int): The time to change in the review time
+        scheduler (SM2Scheduler): Works out the new scheduling numbers
+        indexes (arr): Store indexes of the answered cards, each card at most once
+        quality (arr): How well each card was answered, 0 to 5
+        now (float or arr): The time of the answers in seconds since the epoch
 
         Returns:
         None
         """
-        card.review_time = time
-        self.addCard(card)
+        state = self.gather(["interval", "ease", "repetitions", "lapses"], indexes)
+        self.scatter(scheduler.reviewMany(state, quality, now), indexes)
 
-invalidChars = ["\\","/",":", "*", "?",'"', "<", ">", "|"] #characters that can not be in a file's name in windows
+    def reschedule(self,scheduler):
+        #every card's due time again from its last review, after the scheduler's settings changed
+        state = self.gather(["due", "interval", "repetitions", "reviewed"])
+        self.scatter({"due": scheduler.dueTimes(state)})
 
-directory = r"C:\Users\JoJo\Desktop\Python\hw west\Midterm\Decks"+'\\' # replace with any desired path to store the decks
+    def replayReviews(self,reviews,scheduler):
+        """
+        Rebuilds the scheduling numbers of the cards from a review log in one pass. Each card ends up with the interval
+        and ease of its last answer, repetitions are the correct answers since its last wrong one, lapses are the wrong
+        answers after a correct one, and the due time is worked out from the last answer like dueTimes does
 
-def printCards(deck):
-    """
-    Print all the cards information in a deck
+        Parameters:
+        reviews (dict): The review log's columns, see ReviewLog.read
+        scheduler (SM2Scheduler): Works out the due times
 
-    Parameters
-    deck (arr): An array containing all cards in the deck
+        Returns:
+        int: The number of cards that had answers in the log
+        """
+        index_of = {card.row: index for index, card in enumerate(self.cards)}
+        if numpy is not None:
+            rows = numpy.asarray(reviews["row"])
+            if not rows.size:
+                return 0
+            order = numpy.argsort(rows, kind="stable") #each card's answers together, still oldest first
+            rows = rows[order]
+            failed = numpy.asarray(reviews["quality"])[order] < 3
+            previous = numpy.asarray(reviews["previous"])[order]
+            starts = numpy.flatnonzero(numpy.concatenate(([True], rows[1:] != rows[:-1])))
+            lasts = numpy.concatenate((starts[1:], [rows.size])) - 1
+            #the last wrong answer of each card, or one before its first answer if it has none
+            group_starts = starts.repeat(numpy.diff(numpy.concatenate((starts, [rows.size]))))
+            last_failure = numpy.maximum.reduceat(numpy.where(failed, numpy.arange(rows.size), group_starts - 1), starts)
+            last = order[lasts]
+            state = {"interval": numpy.asarray(reviews["interval"])[last],
+                     "ease": numpy.asarray(reviews["ease"])[last],
+                     "repetitions": lasts - last_failure,
+                     "lapses": numpy.add.reduceat((failed & (previous > 0)).astype("q"), starts),
+                     "reviewed": numpy.asarray(reviews["time"])[last]}
+            card_rows = rows[starts].tolist()
+        else:
+            latest = {} #row -> [interval, ease, repetitions, lapses, reviewed]
+            for row, time, quality, previous, interval, ease in zip(*(reviews[field] for field in ReviewLog.FIELDS)):
+                state = latest.setdefault(row, [0.0, 2.5, 0, 0, 0.0])
+                if quality < 3:
+                    state[2] = 0
+                    state[3] += previous > 0
+                else:
+                    state[2] += 1
+                state[0], state[1], state[4] = interval, ease, time
+            if not latest:
+                return 0
+            card_rows = list(latest)
+            columns = list(zip(*latest.values()))
+            state = dict(zip(("interval", "ease", "repetitions", "lapses", "reviewed"), map(list, columns)))
+        state["due"] = scheduler.dueTimes(dict(state, due=[0.0] * len(card_rows)))
+        #answers for cards that have since been removed are skipped
+        keep = [n for n, row in enumerate(card_rows) if row in index_of]
+        if len(keep) < len(card_rows):
+            state = {name: [values[n] for n in keep] for name, values in state.items()}
+        self.scatter(state, [index_of[card_rows[n]] for n in keep])
+        return len(keep)
+
+    def scheduleEntries(self):
+        #the saved scheduling numbers of every card that was ever answered, see scheduleEntry
+        columns = [self.column(name).tolist() for name in scheduleHeader]
+        return [entry for entry in zip(*columns) if entry[-1]]
+
+    def dueCards(self,now):
+        """
+        Finds the cards that are due for review
+
+        Parameters:
+        now (float): The current time in seconds since the epoch
+
+        Returns:
+        arr: The cards whose due time is at or before now, in the order they were added
+        """
+        due = self.column("due")
+        if numpy is not None:
+            return [self.cards[index] for index in numpy.flatnonzero(due <= now).tolist()]
+        return [self.cards[index] for index, when in enumerate(due) if when <= now]
+
+    def statistics(self,now):
+        """
+        Sums up the deck's scheduling numbers
+
+        Parameters:
+        now (float): The current time in seconds since the epoch
+
+        Returns:
+        dict: cards, due, mean_interval (days), mean_ease, lapses, and the oldest and newest creation times
+        """
+        if not self.size:
+            return {"cards": 0, "due": 0, "mean_interval": 0.0, "mean_ease": 0.0, "lapses": 0,
+                    "oldest": None, "newest": None}
+        created = self.column("created")
+        if numpy is not None:
+            dated = created[numpy.isfinite(created)]
+            return {"cards": self.size,
+                    "due": int(numpy.count_nonzero(self.column("due") <= now)),
+                    "mean_interval": float(self.column("interval").mean()),
+                    "mean_ease": float(self.column("ease").mean()),
+                    "lapses": int(self.column("lapses").sum()),
+                    "oldest": float(dated.min()) if dated.size else None,
+                    "newest": float(dated.max()) if dated.size else None}
+        dated = [when for when in created if math.isfinite(when)]
+        return {"cards": self.size,
+                "due": sum(1 for when in self.column("due") if when <= now),
+                "mean_interval": sum(self.column("interval")) / self.size,
+                "mean_ease": sum(self.column("ease")) / self.size,
+                "lapses": sum(self.column("lapses")),
+                "oldest": min(dated, default=None),
+                "newest": max(dated, default=None)}
+
+class SM2Scheduler:
+    GRADES = {"again": 1, "hard": 3, "good": 4, "easy": 5} #study answer -> SM-2 quality from 0 to 5
+
+    def __init__(self,relearn_delay=600,minimum_ease=1.3,interval_modifier=1.0):
+        """
+        The SuperMemo 2 spaced repetition algorithm. A card answered correctly comes back after 1 day, then 6 days,
+        then its last interval times its ease, and every answer moves the ease up or down. A forgotten card starts
+        over and comes back in relearn_delay seconds
+
+        Parameters:
+        relearn_delay (int): Seconds until a forgotten card is due again
+        minimum_ease (float): The lowest an ease can go, lower would show hard cards too often
+        interval_modifier (float): Stretches (above 1) or shrinks (below 1) the time until a remembered card is due
+
+        Returns:
+        None
+        """
+        self.relearn_delay = relearn_delay
+        self.minimum_ease = minimum_ease
+        self.interval_modifier = interval_modifier
+
+    def nextState(self,interval,ease,repetitions,lapses,quality,now):
+        """
+        Works out a card's scheduling numbers after an answer
+
+        Parameters:
+        interval (float): Days between the card's last two reviews
+        ease (float): The card's ease
+        repetitions (int): Correct answers in a row
+        lapses (int): Times the card was forgotten
+        quality (int): How well it was answered, 0 to 5
+        now (float): The time of the answer in seconds since the epoch
+
+        Returns:
+        tuple: The new (due, interval, ease, repetitions, lapses, reviewed), see scheduleHeader
+        """
+        if quality < 3:
+            return now + self.relearn_delay, 0.0, ease, 0, lapses + (repetitions > 0), now
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = interval * ease
+        ease = max(self.minimum_ease, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        return now + interval * self.interval_modifier * 86400, interval, ease, repetitions, lapses, now
+
+    def review(self,card,grade,now):
+        """
+        Schedules a card's next review from how well it was answered
+
+        Parameters:
+        card (Card): The card that was answered
+        grade (str): A key of GRADES
+        now (float): The time of the answer in seconds since the epoch
+
+        Returns:
+        None
+        """
+        state = self.nextState(card.interval, card.ease, card.repetitions, card.lapses, self.GRADES[grade], now)
+        card.due, card.interval, card.ease, card.repetitions, card.lapses, card.reviewed = state
+
+    def reviewMany(self,state,quality,now):
+        """
+        nextState for many cards at once, one pass over whole columns with NumPy or one loop without it
+
+        Parameters:
+        state (dict): "interval", "ease", "repetitions" and "lapses" columns, one value per card
+        quality (arr): How well each card was answered, 0 to 5
+        now (float or arr): The time of the answers in seconds since the epoch
+
+        Returns:
+        dict: The new "due", "interval", "ease", "repetitions", "lapses" and "reviewed" columns
+        """
+        names = scheduleHeader[1:]
+        if numpy is None:
+            times = itertools.repeat(now) if isinstance(now, (int, float)) else now
+            states = map(self.nextState, state["interval"], state["ease"], state["repetitions"], state["lapses"],
+                         quality, times)
+            columns = list(zip(*states)) or [()] * len(names)
+            return {name: list(column) for name, column in zip(names, columns)}
+        interval = numpy.asarray(state["interval"], dtype="d")
+        ease = numpy.asarray(state["ease"], dtype="d")
+        repetitions = numpy.asarray(state["repetitions"], dtype="q")
+        lapses = numpy.asarray(state["lapses"], dtype="q")
+        quality = numpy.asarray(quality, dtype="q")
+        now = numpy.broadcast_to(numpy.asarray(now, dtype="d"), quality.shape)
+        failed = quality < 3
+        passed_repetitions = repetitions + 1
+        passed_interval = numpy.where(passed_repetitions == 1, 1.0,
+                                      numpy.where(passed_repetitions == 2, 6.0, interval * ease))
+        passed_ease = numpy.maximum(self.minimum_ease, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        new_interval = numpy.where(failed, 0.0, passed_interval)
+        return {"due": numpy.where(failed, now + self.relearn_delay,
+                                   now + new_interval * self.interval_modifier * 86400),
+                "interval": new_interval,
+                "ease": numpy.where(failed, ease, passed_ease),
+                "repetitions": numpy.where(failed, 0, passed_repetitions),
+                "lapses": lapses + (failed & (repetitions > 0)),
+                "reviewed": now.copy()}
+
+    def dueTimes(self,state):
+        """
+        Works out when cards are due again from their last review, used after relearn_delay or interval_modifier
+        change so every card follows the new settings. Cards that were never answered keep their due time
+
+        Parameters:
+        state (dict): "due", "interval", "repetitions" and "reviewed" columns, one value per card
+
+        Returns:
+        numpy.ndarray or arr: The new due times
+        """
+        if numpy is None:
+            return [due if not reviewed else
+                    reviewed + self.relearn_delay if not repetitions else
+                    reviewed + interval * self.interval_modifier * 86400
+                    for due, interval, repetitions, reviewed
+                    in zip(state["due"], state["interval"], state["repetitions"], state["reviewed"])]
+        reviewed = numpy.asarray(state["reviewed"], dtype="d")
+        interval = numpy.asarray(state["interval"], dtype="d")
+        remembered = reviewed + interval * self.interval_modifier * 86400
+        forgotten = reviewed + self.relearn_delay
+        due = numpy.where(numpy.asarray(state["repetitions"]) == 0, forgotten, remembered)
+        return numpy.where(reviewed == 0, numpy.asarray(state["due"], dtype="d"), due)
+
+class DeckSchedule:
+    def __init__(self,scheduler=None):
+        """
+        Initializes a deck to be studied as a Priority Queue ordered by when each card is due
+
+        Parameters:
+        scheduler (SM2Scheduler): Decides when an answered card is due again, defaults to SM2Scheduler()
+
+        Returns:
+        None
+        """
+        self.priority_deck = PriorityQueue(key=operator.attrgetter("row"))
+        self.scheduler = scheduler if scheduler is not None else SM2Scheduler()
+
+    def addCard(self,card):
+        """
+        Adds a card with a priority number and their info to the priority queue, a card that is already queued is moved
+
+        Parameters:
+        card (Card): The card to be added to the priority queue
+
+        Returns:
+        None
+        """
+        self.priority_deck.enqueue(card.due,card)
+
+    def addCards(self,cards,due=None):
+        """
+        Adds many cards to the priority queue at once
+
+        Parameters:
+        cards (arr): The cards to be added to the priority queue
+        due (arr): The cards' due times if they are already at hand, saves reading them one card at a time
+
+        Returns:
+        None
+        """
+        if due is None:
+            due = [card.due for card in cards]
+        self.priority_deck.enqueueMany(zip(due, cards))
+
+    def removeCard(self,card=None):
+        """
+        Removes a card from the queue
+
+        Parameters:
+        card (Card): The card to remove, defaults to the next card to review
+
+        Returns:
+        None
+        """
+        if card is None:
+            self.priority_deck.dequeue()
+        else:
+            self.priority_deck.remove(card.row)
+
+    def nextCard(self,now):
+        """
+        Gets the card that has been due the longest
+
+        Parameters:
+        now (float): The current time in seconds since the epoch
+
+        Returns:
+        Card: The card, None if no card is due yet
+        """
+        card = self.priority_deck.peek()
+        if card is not None and card.due <= now:
+            return card
+        return None
+
+    def reviewCard(self,card,grade,now):
+        """
+        Schedules a card from the user's answer and moves it to its new place in the queue
+
+        Parameters:
+        card (Card): The card that was answered
+        grade (str): "again", "hard", "good" or "easy"
+        now (float): The time of the answer in seconds since the epoch
+
+        Returns:
+        None
+        """
+        self.scheduler.review(card, grade, now)
+        self.addCard(card)
+
+class CrossDeckSchedule:
+    def __init__(self,storage,now,scheduler=None):
+        """
+        Studies every deck at once, always giving the card that has been due the longest in any deck. Each deck gives its
+        due cards in due order and the decks are merged lazily, see mergeDecks. Decks without due cards are left out
+        using the storage's deckInfo counts, and a deck is only read once the session reaches its first due card
+
+        Parameters:
+        storage (CsvStorage or SqliteStorage): Where the decks are stored
+        now (float): The start of the session in seconds since the epoch, cards due later are left for the next session
+        scheduler (SM2Scheduler): Decides when an answered card is due again, defaults to SM2Scheduler()
+
+        Returns:
+        None
+        """
+        self.storage = storage
+        self.scheduler = scheduler if scheduler is not None else SM2Scheduler()
+        self.errors = [] #(deck name, message) for every deck that could not be read
+        self.later = math.inf #when the first card that was not due at the start of the session is due
+        firsts = []
+        for deckName, info in storage.deckInfo(now).items():
+            if info.get("columns") == 0:
+                self.errors.append((deckName, "the deck can not be read"))
+                continue
+            if info["due"]:
+                firsts.append((info["first_due"], deckName))
+            self.later = min(self.later, info["next_due"])
+        self.merged = self.mergeDecks(firsts, now)
+        self.head = next(self.merged, None) #(due, deck name, row, card) of the next card from the decks
+        self.requeued = [] #heap of (due, deck name, row, card) for cards answered this session
+
+    def mergeDecks(self,firsts,now):
+        """
+        Merges the due cards of many decks in due order like heapq.merge over their dueStreams, but a deck is only read
+        when its first due time comes up, so starting reads one deck instead of all of them
+
+        Parameters:
+        firsts (arr): (first due time, deck name) for every deck, the first due time can be early but not late
+        now (float): Cards due after this time in seconds since the epoch are left out
+
+        Returns:
+        generator: Yields (due, deck name, row, card) in due order
+        """
+        #(due, 1, deck name, 0, None) for a deck that has not been read yet, after its cards when the due times are equal
+        waiting = [(first_due, 1, deckName, 0, None) for first_due, deckName in firsts]
+        heapq.heapify(waiting)
+        streams = {}
+        while waiting:
+            due, unread, deckName, row, card = heapq.heappop(waiting)
+            if unread:
+                streams[deckName] = self.dueStream(deckName, now)
+            else:
+                yield due, deckName, row, card
+            found = next(streams[deckName], None) #one card of each deck waits in the heap at a time
+            if found is not None:
+                heapq.heappush(waiting, (found[0], 0, *found[1:]))
+
+    def dueStream(self,deckName,now):
+        #a deck's due cards as entries for the merge, a deck that can not be read is skipped
+        try:
+            for card in self.storage.dueCards(deckName, now):
+                yield card.due, deckName, card.row, card
+        except (OSError, UnicodeDecodeError, csv.Error, sqlite3.Error) as e:
+            self.errors.append((deckName, str(e)))
+
+    def upcoming(self):
+        #the entry with the earliest due time whether or not it is due yet
+        if self.requeued and (self.head is None or self.requeued[0] < self.head):
+            return self.requeued[0]
+        return self.head
+
+    def nextDue(self):
+        #when the next card in any deck is due, None if no deck has a card left to study
+        entry = self.upcoming()
+        due = min(self.later, entry[0]) if entry is not None else self.later
+        return None if due == math.inf else due
+
+    def nextCard(self,now):
+        """
+        Gets the card that has been due the longest in any deck
+
+        Parameters:
+        now (float): The current time in seconds since the epoch
+
+        Returns:
+        tuple: (deck name, card), None if no card is due yet
+        """
+        entry = self.upcoming()
+        if entry is not None and entry[0] <= now:
+            return entry[1], entry[3]
+        return None
+
+    def removeCard(self,card):
+        """
+        Takes the card given by nextCard out of the session, it stays due in its deck
+
+        Parameters:
+        card (Card): The card to remove
+
+        Returns:
+        None
+        """
+        if self.head is not None and self.head[3] is card:
+            self.head = next(self.merged, None)
+        else:
+            heapq.heappop(self.requeued)
+
+    def reviewCard(self,deckName,card,grade,now):
+        """
+        Schedules the card given by nextCard from the user's answer, it comes back in this session if it is due again
+        before the session ends
+
+        Parameters:
+        deckName (str): The deck the card is in
+        card (Card): The card that was answered
+        grade (str): "again", "hard", "good" or "easy"
+        now (float): The time of the answer in seconds since the epoch
+
+        Returns:
+        None
+        """
+        self.removeCard(card)
+        self.scheduler.review(card, grade, now)
+        heapq.heappush(self.requeued, (card.due, deckName, card.row, card))
+
+class DeckPool:
+    def __init__(self,budget,flush=None):
+        """
+        Loaded decks that were switched away from, kept so switching back does not load them again. Once the decks
+        together use more than the budget the least recently used ones are dropped
+
+        Parameters:
+        budget (int): The most bytes the kept decks may use, 0 keeps none
+        flush (function): Called with the name of a dropped deck that was changed while it was loaded
+
+        Returns:
+        None
+        """
+        self.budget = budget
+        self.flush = flush
+        self.decks = {} #deck name -> (state, bytes, version, changed), least recently used first
+        self.used = 0 #bytes used by the kept decks
+
+    def __len__(self):
+        return len(self.decks)
+
+    def __contains__(self,deckName):
+        return deckName in self.decks
+
+    def put(self,deckName,state,size,version,changed=False):
+        """
+        Keeps a deck, dropping the least recently used decks until the pool fits in its budget again
+
+        Parameters:
+        deckName (str): The name of the deck
+        state (dict): Everything that has to be restored to use the deck again
+        size (int): The bytes the deck uses
+        version: The storage's deckVersion of the deck now, see take
+        changed (bool): Whether the deck was changed since it was loaded
+
+        Returns:
+        None
+        """
+        self.discard(deckName)
+        self.decks[deckName] = (state, size, version, changed)
+        self.used += size
+        while self.used > self.budget and self.decks:
+            dropped = next(iter(self.decks))
+            state, size, version, changed = self.decks.pop(dropped)
+            self.used -= size
+            if changed and self.flush is not None:
+                self.flush(dropped)
+
+    def take(self,deckName,version):
+        """
+        Takes a deck back out of the pool
+
+        Parameters:
+        deckName (str): The name of the deck
+        version: The storage's deckVersion of the deck now, a deck whose files changed since it was kept is stale
+
+        Returns:
+        dict: The deck's state, None if it is not in the pool or is stale
+        """
+        entry = self.decks.pop(deckName, None)
+        if entry is None:
+            return None
+        self.used -= entry[1]
+        if entry[2] != version:
+            return None
+        return entry[0]
+
+    def discard(self,deckName):
+        entry = self.decks.pop(deckName, None)
+        if entry is not None:
+            self.used -= entry[1]
+
+class BinaryDeck:
+    MAGIC = b"FCDK"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHQQ") #magic, version, unused, card count, where the offset table starts
+    LENGTH = struct.Struct("<I")
+    ROW = struct.Struct("<Q")
+
+    def __init__(self,path):
+        """
+        A read only deck stored in the binary format written by csvToBinary. The file is memory mapped so opening it
+        takes the same time no matter how many cards it has, and a Card is only made when it is asked for
+
+        Parameters:
+        path (str): The path to the binary deck
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, unused, self.count, table_start = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a binary deck")
+        self.view = memoryview(self.map)
+        #every card's record starts at the offset stored for it, 8 bytes each
+        self.offsets = self.view[table_start:table_start + 8 * self.count].cast("Q")
+        self.cards = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self,index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("card index out of range")
+        card = self.cards.get(index)
+        if card is None:
+            row, question, answer, date, deck = self.fields(index)
+            card = Card(str(question, "utf-8"), str(answer, "utf-8"), str(date, "utf-8"), row,
+                        str(deck, "utf-8") or None)
+            self.cards[index] = card
+        return card
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        self.close()
+
+    def fields(self,index):
+        """
+        Reads a card's fields straight out of the mapped file without copying them
+
+        Parameters:
+        index (int): The position of the card in the file
+
+        Returns:
+        int: The csv row of the card
+        memoryview: The question, answer, date created and deck as utf-8 bytes, slices of the mapped file that keep it
+        mapped after close until they are released or dropped
+        """
+        position = self.offsets[index]
+        row = self.ROW.unpack_from(self.map, position)[0]
+        position += self.ROW.size
+        found = [row]
+        for n in range(4):
+            length = self.LENGTH.unpack_from(self.map, position)[0]
+            position += self.LENGTH.size
+            found.append(self.view[position:position + length])
+            position += length
+        return tuple(found)
+
+    def close(self):
+        self.cards = {}
+        if getattr(self, "offsets", None) is not None:
+            self.offsets.release()
+            self.view.release()
+            self.offsets = None
+        try:
+            self.map.close()
+        except BufferError:
+            pass #slices from fields() are still held, the file is unmapped once the last of them is gone
+        self.file.close()
+
+class ReviewLog:
+    MAGIC = b"FCRL"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHH") #magic, version, unused
+    #row, time, quality, interval before, interval after, ease after. Every field is 8 bytes so the file can be read
+    #as one array of 8 byte numbers and each field taken out with a stride
+    RECORD = struct.Struct("<qdqddd")
+    FIELDS = ("row", "time", "quality", "previous", "interval", "ease")
+
+    def __init__(self,path):
+        """
+        An append only binary file of every answer given while studying a deck, one fixed size record per answer.
+        Years of answers can be read back with a couple of bulk reads and replayed with CardStore.replayReviews
+
+        Parameters:
+        path (str): The path to the log, it is made on the first append
+
+        Returns:
+        None
+        """
+        self.path = path
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        return max(0, os.path.getsize(self.path) - self.HEADER.size) // self.RECORD.size
+
+    def appendMany(self,records):
+        """
+        Adds answers to the end of the log, after cutting off a record that a crash left unfinished
+
+        Parameters:
+        records (iterable): (row, time, quality, previous interval, interval, ease) for each answer
+
+        Returns:
+        None
+        """
+        data = b"".join(self.RECORD.pack(*record) for record in records)
+        with open(self.path, "ab") as f:
+            size = f.tell()
+            if size < self.HEADER.size:
+                f.truncate(0)
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+            elif (size - self.HEADER.size) % self.RECORD.size:
+                #the part of a record left by a crash would put every record after it out of line
+                f.truncate(size - (size - self.HEADER.size) % self.RECORD.size)
+            f.write(data)
+
+    def append(self,row,time,quality,previous,interval,ease):
+        self.appendMany([(row, time, quality, previous, interval, ease)])
+
+    def read(self):
+        """
+        Reads the whole log
+
+        Parameters:
+        None
+
+        Returns:
+        dict: field -> a NumPy array (or array.array without numpy) with that field of every record, oldest first
+        """
+        if not os.path.exists(self.path):
+            data = b""
+        else:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        if data:
+            magic, version, unused = self.HEADER.unpack_from(data, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"{self.path} is not a review log")
+        count = max(0, len(data) - self.HEADER.size) // self.RECORD.size #a record cut short by a crash is left out
+        body = memoryview(data)[self.HEADER.size:self.HEADER.size + count * self.RECORD.size]
+        width = len(self.FIELDS)
+        if numpy is not None:
+            records = numpy.frombuffer(body, dtype="<i8").reshape(count, width)
+            return {field: records[:, n].view("<i8" if field in ("row", "quality") else "<f8").copy()
+                    for n, field in enumerate(self.FIELDS)}
+        whole, real = array("q"), array("d")
+        whole.frombytes(body)
+        real.frombytes(body)
+        return {field: (whole if field in ("row", "quality") else real)[n::width] for n, field in enumerate(self.FIELDS)}
+
+class DeckCatalog:
+    FILE = ".catalog"
+
+    def __init__(self,storage):
+        """
+        What is known about every csv deck in a directory: its size, when it was changed, how many cards it has, how
+        many are new and due, and whether it has a deck column. It is saved next to the decks and kept up to date by
+        comparing the directory's and each deck's file stats, so only decks that changed are read again
+
+        Parameters:
+        storage (CsvStorage): The storage whose directory is catalogued
+
+        Returns:
+        None
+        """
+        self.storage = storage
+        self.path = os.path.join(storage.path, self.FILE)
+        self.directory_mtime = None #the directory's st_mtime_ns when the deck names were last listed
+        self.entries = {} #deck name -> dict with the catalogHeader fields, sorted by name
+        self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self,deckName):
+        return deckName in self.entries
+
+    def load(self):
+        #a catalog that can not be read is only a cache, it is made again from the decks
+        try:
+            with open(self.path, "r", newline="") as f:
+                reader = csv.reader(f)
+                self.directory_mtime = int(next(reader)[1])
+                if next(reader) != catalogHeader:
+                    raise ValueError("the catalog is from another version")
+                for fields in reader:
+                    entry = dict(zip(catalogHeader, fields))
+                    for name in ("size", "mtime", "columns", "cards", "new", "scheduled", "due"):
+                        entry[name] = int(entry[name])
+                    for name in ("next_due", "first_due", "counted"):
+                        entry[name] = float(entry[name])
+                    self.entries[entry["name"]] = entry
+        except (OSError, csv.Error, StopIteration, IndexError, KeyError, ValueError):
+            self.directory_mtime = None
+            self.entries = {}
+
+    def save(self):
+        #written in place, replacing the file would change the directory's mtime every time
+        with open(self.path, "r+" if os.path.exists(self.path) else "w", newline="") as f:
+            f.truncate()
+            writer = csv.writer(f)
+            writer.writerow(["directory", self.directory_mtime])
+            writer.writerow(catalogHeader)
+            writer.writerows([entry[name] for name in catalogHeader] for entry in self.entries.values())
+        self.directory_mtime = os.stat(self.storage.path).st_mtime_ns
+
+    def fileStat(self,path):
+        #"size:mtime" of a file next to a deck, "" if there is none
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            return ""
+        return f"{info.st_size}:{info.st_mtime_ns}"
+
+    def readEntry(self,deckName,now):
+        """
+        Reads a deck to make its catalog entry
+
+        Parameters:
+        deckName (str): The name of the deck
+        now (float): The time due counts are made for in seconds since the epoch
+
+        Returns:
+        dict: The deck's entry, a deck that can not be read has columns 0 and no cards
+        """
+        info = os.stat(self.storage.deckPath(deckName))
+        entry = {"name": deckName, "size": info.st_size, "mtime": info.st_mtime_ns,
+                 "journal": self.fileStat(self.storage.journalPath(deckName)),
+                 "schedule": self.fileStat(self.storage.schedulePath(deckName)),
+                 "columns": 0, "cards": 0, "new": 0, "scheduled": 0, "due": 0, "next_due": math.inf,
+                 "first_due": math.inf, "counted": now}
+        try:
+            rows = {card.row for card in self.storage.loadCards(deckName)}
+            with open(self.storage.deckPath(deckName), "r", newline="") as f:
+                header = next(csv.reader(f), [])
+        except (OSError, UnicodeDecodeError, csv.Error):
+            return entry
+        schedule, lines = readSchedule(self.storage.schedulePath(deckName))
+        entry["columns"] = 4 if len(header) > 3 and header[3].strip().lower() == "deck" else 3
+        entry["cards"] = len(rows)
+        entry["new"] = len(rows - schedule.keys())
+        entry["scheduled"] = len(schedule)
+        self.countDue(entry, {row: values for row, values in schedule.items() if row in rows}, now)
+        return entry
+
+    def countDue(self,entry,schedule,now):
+        #due counts only change with time, and only once the next card not yet due is reached
+        due = [values[0] for values in schedule.values()]
+        entry["due"] = entry["new"] + sum(1 for time in due if time <= now)
+        entry["next_due"] = min((time for time in due if time > now), default=math.inf)
+        #when the deck's first card is due, new cards are due from the start
+        entry["first_due"] = 0.0 if entry["new"] else min(due, default=math.inf)
+        entry["counted"] = now
+
+    def refresh(self,now=None):
+        """
+        Brings the catalog up to date with the directory. The deck names are only listed again if the directory changed,
+        a deck is only read again if its cards changed, and only its schedule is read if cards were studied or became due
+
+        Parameters:
+        now (float): The time due counts are made for in seconds since the epoch, defaults to now
+
+        Returns:
+        dict: deck name -> entry, sorted by name
+        """
+        now = dt.now().timestamp() if now is None else now
+        changed = False
+        directory_mtime = os.stat(self.storage.path).st_mtime_ns
+        if directory_mtime != self.directory_mtime:
+            names = sorted(name for name in os.listdir(self.storage.path) if name.lower().endswith(".csv"))
+            self.entries = {name: self.entries.get(name) for name in names}
+            self.directory_mtime = directory_mtime
+            changed = True
+        for deckName, entry in self.entries.items():
+            try:
+                info = os.stat(self.storage.deckPath(deckName))
+            except FileNotFoundError:
+                continue #removed since the directory was listed, the next refresh drops it
+            if (entry is None or (entry["size"], entry["mtime"]) != (info.st_size, info.st_mtime_ns)
+                    or entry["journal"] != self.fileStat(self.storage.journalPath(deckName))):
+                self.entries[deckName] = self.readEntry(deckName, now)
+                changed = True
+            elif entry["schedule"] != self.fileStat(self.storage.schedulePath(deckName)):
+                #only cards were studied, the cards are the same so only the schedule is read. A row the schedule did
+                #not have before was a new card that has now been studied
+                schedule = readSchedule(self.storage.schedulePath(deckName))[0]
+                entry["new"] = min(entry["cards"], max(0, entry["new"] - (len(schedule) - entry["scheduled"])))
+                entry["scheduled"] = len(schedule)
+                entry["schedule"] = self.fileStat(self.storage.schedulePath(deckName))
+                self.countDue(entry, schedule, now)
+                changed = True
+            elif not entry["counted"] <= now < entry["next_due"]:
+                #a card that was removed keeps its schedule line, so this can count one the deck no longer has
+                self.countDue(entry, readSchedule(self.storage.schedulePath(deckName))[0], now)
+                changed = True
+        self.entries = {name: entry for name, entry in self.entries.items() if entry is not None}
+        if changed:
+            self.save()
+        return self.entries
+
+class CsvStorage:
+    def __init__(self,path,journal_limit=1 << 20):
+        """
+        Stores every deck as a csv file in a directory, this is the default storage for Deck. Edits, adds and removals
+        are appended to a journal file next to the deck instead of rewriting it, the journal is replayed when the deck
+        is loaded and merged back into the csv in the background once it gets big
+
+        Parameters:
+        path (str): The directory where the decks are stored
+        journal_limit (int): The journal size in bytes that starts a compaction
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.journal_limit = journal_limit
+        self.lock = threading.Lock() #held while appending to or compacting a journal
+        self.compactions = {} #deck name -> running compaction thread
+        self.catalog = None #DeckCatalog, loaded the first time deckInfo is called
+
+    def deckPath(self,deckName):
+        return os.path.join(self.path, deckName)
+
+    def journalPath(self,deckName):
+        return self.deckPath(deckName) + ".journal"
+
+    def schedulePath(self,deckName):
+        return self.deckPath(deckName) + ".schedule"
+
+    def deckStats(self,deckName):
+        #(csv size, csv mtime, journal size, journal mtime), a deck without a journal has 0 for both
+        stats = []
+        for path in (self.deckPath(deckName), self.journalPath(deckName)):
+            try:
+                info = os.stat(path)
+                stats += [info.st_size, info.st_mtime_ns]
+            except FileNotFoundError:
+                stats += [0, 0]
+        return tuple(stats)
+
+    def deckVersion(self,deckName):
+        #changes whenever one of the deck's files does, see DeckPool
+        try:
+            info = os.stat(self.schedulePath(deckName))
+            schedule = (info.st_size, info.st_mtime_ns)
+        except FileNotFoundError:
+            schedule = (0, 0)
+        return self.deckStats(deckName) + schedule
+
+    def flushDeck(self,deckName):
+        #a deck that is no longer kept in memory gets its journal merged into the csv in the background
+        if os.path.exists(self.journalPath(deckName)):
+            self.startCompaction(deckName)
+
+    def listDecks(self):
+        return sorted(name for name in os.listdir(self.path) if name.lower().endswith(".csv"))
+
+    def deckInfo(self,now=None):
+        """
+        Gets what is known about every deck without opening the ones that have not changed, see DeckCatalog
+
+        Parameters:
+        now (float): The time due counts are made for in seconds since the epoch, defaults to now
+
+        Returns:
+        dict: deck name -> dict with the catalogHeader fields, sorted by name
+        """
+        self.waitForCompaction()
+        with self.lock:
+            if self.catalog is None:
+                self.catalog = DeckCatalog(self)
+            return self.catalog.refresh(now)
+
+    def loadCards(self,deckName,errors=None,keep=None):
+        """
+        Reads a deck's cards with its journal applied
+
+        Parameters:
+        deckName (str): The name of the deck
+        errors (arr): Optional list that (line number, message) pairs are added to for every row that was skipped
+        keep (callable): Optional test of a row, no Card is made for the rows of the csv it is false for
+
+        Returns:
+        generator: Yields a Card for every card in the deck
+        """
+        self.waitForCompaction(deckName)
+        edits, removed, added = readJournal(self.journalPath(deckName), errors)
+        for card in readCards(self.deckPath(deckName), errors, keep):
+            if card.row in removed:
+                continue
+            if card.row in edits:
+                card.question, card.answer = edits[card.row]
+            yield card
+        for row in sorted(added):
+            question, answer, date, deck = added[row]
+            yield Card(question, answer, date, row, deck)
+
+    def writeDeck(self,deckName,cards):
+        """
+        Writes a whole deck, replacing it if it exists
+
+        Parameters:
+        deckName (str): The name of the deck
+        cards (iterable): The cards in the deck
+
+        Returns:
+        None
+        """
+        self.waitForCompaction(deckName)
+        cards = iter(cards)
+        first = next(cards, None)
+        has_deck = first is not None and first.deck is not None #keep the deck column if the cards came with one
+        temp = self.deckPath(deckName) + ".tmp"
+        try:
+            with open(temp, "w", newline='') as f:
+                w = csv.writer(f)
+                w.writerow(deckHeader + ["deck"] if has_deck else deckHeader)
+                if first is not None:
+                    w.writerows(cardFields(card, has_deck) for card in itertools.chain([first], cards))
+        except BaseException:
+            os.remove(temp) #the cards could not all be read, the old deck is left as it was
+            raise
+        os.replace(temp, self.deckPath(deckName))
+        #the rows start over from 1, anything saved for the old rows no longer applies, their review log included
+        for path in (self.journalPath(deckName), self.schedulePath(deckName), self.deckPath(deckName) + ".reviews"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def appendJournal(self,deckName,entry):
+        #one short append per change no matter how big the deck is
+        line = io.StringIO()
+        csv.writer(line).writerow(entry)
+        with self.lock:
+            size = self.writeJournal(deckName, line.getvalue())
+        if size > self.journal_limit:
+            self.startCompaction(deckName)
+
+    def writeJournal(self,deckName,text):
+        #must be called with the lock held, a line a crash cut short is ended first so it does not run into the new one
+        path = self.journalPath(deckName)
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b"\n", b"\r"):
+                    text = "\r\n" + text
+        with open(path, "a", newline='') as f:
+            f.write(text)
+            return f.tell()
+
+    def addCard(self,deckName,card):
+        self.appendJournal(deckName, journalEntry("add", card))
+
+    def updateCard(self,deckName,card):
+        self.appendJournal(deckName, journalEntry("edit", card))
+
+    def removeCard(self,deckName,card):
+        self.appendJournal(deckName, journalEntry("remove", card))
+
+    def startCompaction(self,deckName):
+        running = self.compactions.get(deckName)
+        if running is not None and running.is_alive():
+            return
+        thread = threading.Thread(target=self.compactDeck, args=(deckName,), daemon=True)
+        self.compactions[deckName] = thread
+        thread.start()
+
+    def waitForCompaction(self,deckName=None):
+        for name, thread in list(self.compactions.items()):
+            if deckName is None or name == deckName:
+                thread.join()
+                self.compactions.pop(name, None)
+
+    def compactDeck(self,deckName):
+        """
+        Merges a deck's journal into its csv. Removed cards become blank lines so every other card keeps its row.
+        The merged deck is written to a temporary file that then replaces the csv, so a crash leaves the old one
+
+        Parameters:
+        deckName (str): The name of the deck
+
+        Returns:
+        None
+        """
+        with self.lock:
+            if os.path.exists(self.journalPath(deckName)):
+                self.rewriteDeck(deckName)
+
+    def applyChanges(self,deckName,entries):
+        """
+        Saves a batch of changes in one write. A batch that fits in the journal is appended to it as one line that is
+        only replayed if it was written to the end, see batchRecord. A bigger one is merged with the journal into one
+        rewrite of the csv
+
+        Parameters:
+        deckName (str): The name of the deck
+        entries (arr): Journal entries, see applyJournalEntry
+
+        Returns:
+        None
+        """
+        self.waitForCompaction(deckName)
+        block = io.StringIO()
+        csv.writer(block).writerow(batchRecord(entries))
+        block = block.getvalue()
+        with self.lock:
+            journal = self.journalPath(deckName)
+            size = os.path.getsize(journal) if os.path.exists(journal) else 0
+            if size + len(block) <= self.journal_limit:
+                self.writeJournal(deckName, block)
+            else:
+                self.rewriteDeck(deckName, entries)
+
+    def rewriteDeck(self,deckName,entries=()):
+        #must be called with the lock held
+        journal = self.journalPath(deckName)
+        edits, removed, added = readJournal(journal)
+        for entry in entries:
+            applyJournalEntry(entry, edits, removed, added)
+        temp = self.deckPath(deckName) + ".tmp"
+        with open(self.deckPath(deckName), "r", newline="") as source, open(temp, "w", newline='') as f:
+            w = csv.writer(f)
+            records = 0
+            has_deck = False
+            for row, fields in enumerate(csv.reader(source)):
+                if row == 0:
+                    has_deck = len(fields) > 3 and fields[3].strip().lower() == "deck"
+                elif row in removed:
+                    fields = []
+                elif row in edits and len(fields) >= 2:
+                    fields[0], fields[1] = edits[row]
+                w.writerow(fields)
+                records = row + 1
+            for row in sorted(added):
+                while records < row:
+                    w.writerow([])
+                    records += 1
+                question, answer, date, deck = added[row]
+                #an added row has as many fields as the header even when the card has no deck value
+                w.writerow([question, answer, date] + ([deck or ""] if has_deck or deck else []))
+                records += 1
+        os.replace(temp, self.deckPath(deckName))
+        if os.path.exists(journal):
+            os.remove(journal)
+
+    def loadSchedule(self,deckName):
+        """
+        Reads the scheduling numbers saved for a deck, rewriting the file without the old lines once most of it is
+        replaced lines
+
+        Parameters:
+        deckName (str): The name of the deck
+
+        Returns:
+        dict: row -> (due, interval, ease, repetitions, lapses, reviewed)
+        """
+        with self.lock:
+            schedule, lines = readSchedule(self.schedulePath(deckName))
+            if lines > 2 * len(schedule) + 1000:
+                temp = self.schedulePath(deckName) + ".tmp"
+                with open(temp, "w", newline='') as f:
+                    csv.writer(f).writerows([row, *values] for row, values in schedule.items())
+                os.replace(temp, self.schedulePath(deckName))
+        return schedule
+
+    def updateSchedule(self,deckName,entries):
+        #appended like the journal, the last line for a row is the one that counts
+        with self.lock:
+            with open(self.schedulePath(deckName), "a", newline='') as f:
+                csv.writer(f).writerows(entries)
+
+    def dueCards(self,deckName,now):
+        """
+        Reads the cards of a deck that are due, the one due the longest first. The saved schedule is read first, the
+        csv is then read to the end to find the new cards but a Card is only made for the due rows
+
+        Parameters:
+        deckName (str): The name of the deck
+        now (float): Cards due after this time in seconds since the epoch are left out
+
+        Returns:
+        generator: Yields the due cards with their scheduling numbers set
+        """
+        schedule = self.loadSchedule(deckName)
+        due = lambda row: row not in schedule or schedule[row][0] <= now
+        cards = [card for card in self.loadCards(deckName, keep=due) if due(card.row)]
+        store = CardStore(len(cards))
+        store.addCards(cards)
+        store.applySchedule(schedule)
+        due = store.column("due").tolist()
+        order = sorted(range(len(cards)), key=due.__getitem__)
+        return (cards[index] for index in order)
+
+    def importDeck(self,cards,deckName):
+        #writeDeck drops what an old deck of the same name left behind
+        self.writeDeck(deckName, cards)
+
+    def renameDeck(self,deckName,newName):
+        #moves a deck and the files kept next to it, files an old deck left under the new name are removed
+        self.waitForCompaction(deckName)
+        for suffix in ("", ".journal", ".schedule", ".reviews"):
+            if os.path.exists(self.deckPath(deckName) + suffix):
+                os.replace(self.deckPath(deckName) + suffix, self.deckPath(newName) + suffix)
+            elif os.path.exists(self.deckPath(newName) + suffix):
+                os.remove(self.deckPath(newName) + suffix)
+
+    def exportDeck(self,deckName,folder):
+        self.waitForCompaction(deckName)
+        self.compactDeck(deckName)
+        shutil.copy(self.deckPath(deckName), folder)
+
+    def close(self):
+        self.waitForCompaction()
+
+class SqliteStorage:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS decks (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS cards (
+            deck_id INTEGER NOT NULL REFERENCES decks(id) ON DELETE CASCADE,
+            row INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            date_created TEXT NOT NULL,
+            deck TEXT,
+            due REAL,
+            interval REAL NOT NULL DEFAULT 0,
+            ease REAL NOT NULL DEFAULT 2.5,
+            repetitions INTEGER NOT NULL DEFAULT 0,
+            lapses INTEGER NOT NULL DEFAULT 0,
+            reviewed REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (deck_id, row)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS cards_question ON cards (deck_id, question);
+        CREATE INDEX IF NOT EXISTS cards_answer ON cards (deck_id, answer);
+        CREATE INDEX IF NOT EXISTS cards_date ON cards (deck_id, date_created);
+        CREATE INDEX IF NOT EXISTS cards_due ON cards (deck_id, due);
+    """
+    #columns added after the first version of the schema, added to older databases when they are opened
+    ADDED_COLUMNS = {"interval": "REAL NOT NULL DEFAULT 0", "ease": "REAL NOT NULL DEFAULT 2.5",
+                     "repetitions": "INTEGER NOT NULL DEFAULT 0", "lapses": "INTEGER NOT NULL DEFAULT 0",
+                     "reviewed": "REAL NOT NULL DEFAULT 0"}
+
+    def __init__(self,db_path):
+        """
+        Stores every deck in one SQLite database. A card's row is its key so edits and adds only touch that card, and
+        sorting is an indexed ORDER BY. Decks keep their csv file name as their name so they can be exported as is
+
+        Parameters:
+        db_path (str): The path to the database file, it is made if it does not exist
+
+        Returns:
+        None
+        """
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(self.SCHEMA)
+        columns = {info[1] for info in self.db.execute("PRAGMA table_info(cards)")}
+        with self.db:
+            for column, definition in self.ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.db.execute(f"ALTER TABLE cards ADD COLUMN {column} {definition}")
+
+    def deckId(self,deckName,create=False):
+        found = self.db.execute("SELECT id FROM decks WHERE name = ?", (deckName,)).fetchone()
+        if found:
+            return found[0]
+        if not create:
+            raise sqlite3.OperationalError(f"there is no deck named {deckName}")
+        return self.db.execute("INSERT INTO decks (name) VALUES (?)", (deckName,)).lastrowid
+
+    def listDecks(self):
+        return [name for (name,) in self.db.execute("SELECT name FROM decks ORDER BY name")]
+
+    def deckInfo(self,now=None):
+        #the same counts as DeckCatalog, here they are index lookups so nothing is cached
+        now = dt.now().timestamp() if now is None else now
+        query = """
+            SELECT name,
+                   (SELECT count(*) FROM cards WHERE deck_id = id),
+                   (SELECT count(*) FROM cards WHERE deck_id = id AND due IS NULL),
+                   (SELECT count(*) FROM cards WHERE deck_id = id AND due <= ?),
+                   (SELECT min(due) FROM cards WHERE deck_id = id),
+                   (SELECT min(due) FROM cards WHERE deck_id = id AND due > ?)
+            FROM decks ORDER BY name
+        """
+        return {name: {"name": name, "cards": cards, "new": new, "due": new + due,
+                       "first_due": 0.0 if new else (math.inf if first_due is None else first_due),
+                       "next_due": math.inf if next_due is None else next_due}
+                for name, cards, new, due, first_due, next_due in self.db.execute(query, (now, now))}
+
+    def deckVersion(self,deckName):
+        #the database is only changed through this storage, Deck drops pooled decks it changes some other way
+        return None
+
+    def flushDeck(self,deckName):
+        pass #every change is already in the database
+
+    def countCards(self,deckName):
+        return self.db.execute("SELECT count(*) FROM cards WHERE deck_id = ?", (self.deckId(deckName),)).fetchone()[0]
+
+    def loadCards(self,deckName,errors=None):
+        deck_id = self.deckId(deckName)
+        query = "SELECT question, answer, date_created, row, deck FROM cards WHERE deck_id = ? ORDER BY row"
+        for question, answer, date, row, deck in self.db.execute(query, (deck_id,)):
+            yield Card(question, answer, date, row, deck)
+
+    def writeDeck(self,deckName,cards):
+        """
+        Writes a whole deck in one transaction, replacing it if it exists
+
+        Parameters:
+        deckName (str): The name of the deck
+        cards (iterable): The cards in the deck
+
+        Returns:
+        None
+        """
+        with self.db:
+            self.db.execute("DELETE FROM decks WHERE name = ?", (deckName,))
+            deck_id = self.deckId(deckName, create=True)
+            self.db.executemany(
+                "INSERT INTO cards (deck_id, row, question, answer, date_created, deck) VALUES (?, ?, ?, ?, ?, ?)",
+                ((deck_id, card.row, card.question, card.answer, card.date, card.deck) for card in cards))
+
+    def addCard(self,deckName,card):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO cards (deck_id, row, question, answer, date_created, deck) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.deckId(deckName), card.row, card.question, card.answer, card.date, card.deck))
+
+    def updateCard(self,deckName,card):
+        with self.db:
+            self.db.execute("UPDATE cards SET question = ?, answer = ? WHERE deck_id = ? AND row = ?",
+                            (card.question, card.answer, self.deckId(deckName), card.row))
+
+    def removeCard(self,deckName,card):
+        with self.db:
+            self.db.execute("DELETE FROM cards WHERE deck_id = ? AND row = ?", (self.deckId(deckName), card.row))
+
+    def applyChanges(self,deckName,entries):
+        """
+        Saves a batch of changes in one transaction
+
+        Parameters:
+        deckName (str): The name of the deck
+        entries (arr): Journal entries, see applyJournalEntry
+
+        Returns:
+        None
+        """
+        with self.db:
+            deck_id = self.deckId(deckName)
+            for entry in entries:
+                action, row = entry[0], entry[1]
+                if action == "add":
+                    self.db.execute(
+                        "INSERT INTO cards (deck_id, row, question, answer, date_created, deck) VALUES (?, ?, ?, ?, ?, ?)",
+                        (deck_id, row, entry[2], entry[3], entry[4], entry[5] or None))
+                elif action == "edit":
+                    self.db.execute("UPDATE cards SET question = ?, answer = ? WHERE deck_id = ? AND row = ?",
+                                    (entry[2], entry[3], deck_id, row))
+                elif action == "remove":
+                    self.db.execute("DELETE FROM cards WHERE deck_id = ? AND row = ?", (deck_id, row))
+
+    def loadSchedule(self,deckName):
+        query = ("SELECT row, due, interval, ease, repetitions, lapses, reviewed FROM cards "
+                 "WHERE deck_id = ? AND due IS NOT NULL")
+        return {row: tuple(values) for row, *values in self.db.execute(query, (self.deckId(deckName),))}
+
+    def updateSchedule(self,deckName,entries):
+        with self.db:
+            deck_id = self.deckId(deckName)
+            self.db.executemany(
+                "UPDATE cards SET due = ?, interval = ?, ease = ?, repetitions = ?, lapses = ?, reviewed = ? "
+                "WHERE deck_id = ? AND row = ?",
+                ((due, interval, ease, repetitions, lapses, reviewed, deck_id, row)
+                 for row, due, interval, ease, repetitions, lapses, reviewed in entries))
+
+    def dueCards(self,deckName,now,batch=256):
+        """
+        Reads the cards of a deck that are due, the one due the longest first. Only the due rows are found up front with
+        the due index, the cards themselves are read a batch at a time as they are asked for
+
+        Parameters:
+        deckName (str): The name of the deck
+        now (float): Cards due after this time in seconds since the epoch are left out
+        batch (int): How many cards are read at a time
+
+        Returns:
+        generator: Yields the due cards with their scheduling numbers set
+        """
+        deck_id = self.deckId(deckName)
+        #cards that were never studied have no due time and come first, two queries so both are ranges of the due index
+        rows = [row for (row,) in self.db.execute("SELECT row FROM cards WHERE deck_id = ? AND due IS NULL", (deck_id,))]
+        rows += [row for (row,) in self.db.execute(
+            "SELECT row FROM cards WHERE deck_id = ? AND due <= ? ORDER BY due", (deck_id, now))]
+        for start in range(0, len(rows), batch):
+            chunk = rows[start:start + batch]
+            query = ("SELECT question, answer, date_created, row, deck, due, interval, ease, repetitions, lapses, reviewed "
+                     f"FROM cards WHERE deck_id = ? AND row IN ({', '.join('?' * len(chunk))})")
+            found = {fields[3]: fields for fields in self.db.execute(query, (deck_id, *chunk))}
+            cards = [Card(*found[row][:5]) for row in chunk if row in found]
+            store = CardStore(len(cards))
+            store.addCards(cards)
+            store.applySchedule({row: found[row][5:] for row in chunk if row in found and found[row][5] is not None})
+            yield from cards
+
+    def importDeck(self,cards,deckName):
+        self.writeDeck(deckName, cards)
+
+    def renameDeck(self,deckName,newName):
+        with self.db:
+            self.db.execute("UPDATE decks SET name = ? WHERE name = ?", (newName, deckName))
+
+    def exportDeck(self,deckName,folder):
+        CsvStorage(folder).writeDeck(deckName, self.loadCards(deckName))
+
+    def close(self):
+        self.db.close()
+
+class BatchStorage:
+    def __init__(self,storage):
+        """
+        Wraps a storage so card changes are kept in memory until commit, which saves all of them in one write
+        (one journal append or rewrite of the csv, or one SQLite transaction). Everything else goes straight to the
+        wrapped storage
+
+        Parameters:
+        storage (CsvStorage or SqliteStorage): The storage to save the changes to
+
+        Returns:
+        None
+        """
+        self.storage = storage
+        self.pending = {} #deck name -> journal entries waiting to be saved
+
+    def __getattr__(self,name):
+        return getattr(self.storage, name)
+
+    def addCard(self,deckName,card):
+        self.pending.setdefault(deckName, []).append(journalEntry("add", card))
+
+    def updateCard(self,deckName,card):
+        self.pending.setdefault(deckName, []).append(journalEntry("edit", card))
+
+    def removeCard(self,deckName,card):
+        self.pending.setdefault(deckName, []).append(journalEntry("remove", card))
+
+
+    def commit(self):
+        for deckName, entries in self.pending.items():
+            self.storage.applyChanges(deckName, entries)
+        self.pending = {}
+
+    def rollback(self):
+        self.pending = {}
+
+def migrateCsvDirectory(csv_path, db_path):
+    """
+    Bulk loads every csv deck in a directory and its saved schedule into a SQLite database, each deck in a single
+    transaction. A deck that can not be read is reported and skipped, the others are still loaded
+
+    Parameters
+    csv_path (str): The directory with the csv decks
+    db_path (str): The database to load them into
 
     Returns
-    None
+    dict: The number of cards loaded for each deck name, skipped decks are left out
     """
-    for n, card in enumerate(deck, 1):
-        print(f"{n}): Question): {card.question} Answer):{card.answer} Date Created): {card.date}")
-    print(f"{len(deck) + 1}): Back")
+    storage = SqliteStorage(db_path)
+    loaded = {}
+    try:
+        for name in sorted(os.listdir(csv_path)):
+            if not name.lower().endswith(".csv"):
+                continue
+            errors = []
+            csv_storage = CsvStorage(csv_path)
+            try:
+                storage.writeDeck(name, csv_storage.loadCards(name, errors))
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                print(f"{name}: skipped, {e}") #writeDeck's transaction is rolled back so nothing of it is kept
+                continue
+            storage.updateSchedule(name, ([row, *values] for row, values in csv_storage.loadSchedule(name).items()))
+            loaded[name] = storage.countCards(name)
+            for line, message in errors:
+                print(f"{name}: skipped line {line}: {message}")
+    finally:
+        storage.close()
+    return loaded
+
+maxCards = None # the most cards a deck can have, None for no limit
+
+deckPoolBytes = 256 << 20 # memory decks that were switched away from may keep using so switching back is instant, 0 keeps none
+
+pageSize = 50 # how many cards are listed at a time when picking a card to edit
+
+sortCollation = "casefold" # how Sort Cards compares text: "exact", "casefold" or "locale", see sortCollations
+
+invalidChars = ["\\","/",":", "*", "?",'"', "<", ">", "|"] #characters that can not be in a file's name in windows
+
+directory = r"C:\Users\JoJo\Desktop\Python\hw west\Midterm\Decks"+'\\' # replace with any desired path to store the decks
+
+database = None # set to a .db path to keep the decks in SQLite instead of csv files, see migrateCsvDirectory
+
+deckHeader = ["question", "answer", "date_created"] #an optional fourth "deck" column is allowed
 
-def quickSort(ar, low, high, obj_func):
-    if low >= high:
+scheduleHeader = ["row", "due", "interval", "ease", "repetitions", "lapses", "reviewed"] #saved for a card after studying it
+
+catalogHeader = ["name", "size", "mtime", "journal", "schedule", "columns", "cards", "new", "scheduled", "due",
+                 "next_due", "first_due", "counted"] #see DeckCatalog
+
+sortCollations = {"exact": None, "casefold": str.casefold, "locale": locale.strxfrm} #how sortCards compares text
+
+@contextlib.contextmanager
+def collectionPaused():
+    #loading a deck makes hundreds of thousands of objects that are all kept, the cyclic garbage collector would keep
+    #stopping to scan every one of them again
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def cardFields(card, has_deck=False):
+    #the fields of a csv row for a card
+    if has_deck:
+        return [card.question, card.answer, card.date, card.deck or ""]
+    return [card.question, card.answer, card.date]
+
+def readCards(path, errors=None, keep=None):
+    """
+    Reads the cards of a csv deck one at a time without loading the whole file
+
+    Parameters
+    path (str): The path to the csv file
+    errors (arr): Optional list that (line number, message) pairs are added to for every row that was skipped
+    keep (callable): Optional test of a row number, the rows it is false for are passed over without making a Card
+
+    Returns
+    generator: Yields a Card for every valid row, the header is skipped
+    """
+    with open(path, "r", newline="") as f:
+        yield from parseCards(f, path, errors, keep)
+
+def parseCards(f, path, errors=None, keep=None):
+    """
+    Reads the cards of a csv deck from a file that is already open, see readCards
+
+    Parameters
+    f (file): The csv deck opened as text with newline=""
+    path (str): The name of the deck used in error messages
+    errors (arr): Optional list that (line number, message) pairs are added to for every row that was skipped
+    keep (callable): Optional test of a row number, see readCards
+
+    Returns
+    generator: Yields a Card for every valid row, the header is skipped
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        raise csv.Error(f"{path} is empty, a deck starts with a question,answer,date_created header")
+    if [field.strip().lower() for field in header[:3]] != deckHeader:
+        raise csv.Error(f"{path} does not start with a question,answer,date_created header")
+    has_deck = len(header) > 3 and header[3].strip().lower() == "deck"
+    width = 4 if has_deck else 3
+
+    #row counts csv records not lines so it matches the row editCard rewrites, quoted fields can span lines
+    for row, fields in enumerate(reader, 1):
+        if not fields or keep is not None and not keep(row):
+            continue
+        if len(fields) < 3:
+            if errors is not None:
+                errors.append((reader.line_num, f"expected {width} fields but found {len(fields)}"))
+            continue
+        if fields[0] == "":
+            if errors is not None:
+                errors.append((reader.line_num, "the card has no question"))
+            continue
+        yield Card(fields[0], fields[1], fields[2], row, fields[3] if has_deck and len(fields) > 3 else None)
+
+def parseDeckFile(path, deckName):
+    """
+    Reads a csv deck and its saved schedule for Deck.loadDecks, this runs in a worker process so the deck is returned
+    as one list per field, which is much quicker to send back than Card objects
+
+    Parameters
+    path (str): The directory where the decks are stored
+    deckName (str): The name of the deck
+
+    Returns
+    tuple: (questions, answers, dates, rows, decks, schedule, errors), decks is None when no card has one, rows is an
+    array, schedule is as from readSchedule and errors are (line number, message) pairs of skipped rows
+    """
+    storage = CsvStorage(path)
+    errors = []
+    questions, answers, dates, rows, decks = [], [], [], array("q"), []
+    with collectionPaused():
+        for card in storage.loadCards(deckName, errors):
+            questions.append(card.question)
+            answers.append(card.answer)
+            dates.append(card.date)
+            rows.append(card.row)
+            decks.append(card.deck)
+    schedule, lines = readSchedule(storage.schedulePath(deckName))
+    if not any(decks):
+        decks = None
+    return questions, answers, dates, rows, decks, schedule, errors
+
+def findDeckSources(pattern):
+    """
+    Finds the csv decks to import at a path: the file itself, every csv file under a directory, every csv file in a
+    zip or tar archive, or everything a glob pattern matches
+
+    Parameters
+    pattern (str): A csv file, a directory, a glob pattern or a zip or tar archive
+
+    Returns
+    arr: (source, member, name) for every deck, member is the file's name in the archive source or None for a file on
+    disk, name is the file name it would be imported as
+    """
+    paths = [pattern] if os.path.exists(pattern) else sorted(glob.glob(pattern, recursive=True))
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = sorted(glob.glob(os.path.join(glob.escape(path), "**", "*"), recursive=True))
+            sources += [(found_path, None, os.path.basename(found_path)) for found_path in found
+                        if found_path.lower().endswith(".csv") and os.path.isfile(found_path)]
+        elif path.lower().endswith(".csv"):
+            sources.append((path, None, os.path.basename(path)))
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                sources += [(path, info.filename, os.path.basename(info.filename)) for info in archive.infolist()
+                            if not info.is_dir() and info.filename.lower().endswith(".csv")]
+        elif tarfile.is_tarfile(path):
+            with tarfile.open(path) as archive:
+                sources += [(path, info.name, os.path.basename(info.name)) for info in archive
+                            if info.isfile() and info.name.lower().endswith(".csv")]
+    return sources
+
+def uniqueDeckName(name, taken):
+    """
+    Picks the name a deck is imported as: the file name without the characters a deck name can not have, and "(2)",
+    "(3)"... added until it is not taken
+
+    Parameters
+    name (str): The file name of the deck
+    taken (set): The lower case names already in use, the picked name is added to it
+
+    Returns
+    str: The deck name
+    """
+    stem = "".join("_" if char in invalidChars else char for char in name[:-4]) or "_"
+    for deckName in itertools.chain([stem + ".csv"], (f"{stem} ({n}).csv" for n in itertools.count(2))):
+        if deckName.lower() not in taken:
+            taken.add(deckName.lower())
+            return deckName
+
+@contextlib.contextmanager
+def openDeckSource(source, member=None, archives=None):
+    """
+    Opens a csv deck to import as text, from disk or straight out of a zip or tar archive without extracting it
+
+    Parameters
+    source (str): The csv file, or the archive the deck is in
+    member (str): The deck's name in the archive, None if source is the csv file
+    archives (dict): Archives that were already opened, source -> ZipFile or TarFile, new ones are added
+
+    Returns
+    file: The deck opened for reading as text
+    """
+    if member is None:
+        with open(source, "r", newline="") as f:
+            yield f
         return
+    archives = {} if archives is None else archives
+    archive = archives.get(source)
+    if archive is None:
+        archive = zipfile.ZipFile(source) if zipfile.is_zipfile(source) else tarfile.open(source)
+        archives[source] = archive
+    raw = archive.open(member) if isinstance(archive, zipfile.ZipFile) else archive.extractfile(member)
+    if raw is None:
+        raise OSError(f"{member} is not a file")
+    with io.TextIOWrapper(raw, newline="") as f:
+        yield f
+
+def importCards(storage, items):
+    """
+    Imports csv decks one after another, reading each one a row at a time as it is written to the storage
+
+    Parameters
+    storage (CsvStorage or SqliteStorage): Where the decks are imported to
+    items (arr): (source, member, deck name) for each deck, see findDeckSources
+
+    Returns
+    arr: (cards imported, skipped rows, error message) for each deck, the error message is None if it was imported
+    """
+    results = []
+    archives = {} #each archive is opened once, members of a tar archive come in the order they are stored
+    try:
+        for source, member, deckName in items:
+            skipped = []
+            count = itertools.count()
+            try:
+                with openDeckSource(source, member, archives) as f:
+                    cards = parseCards(f, member or source, skipped)
+                    storage.importDeck((card for card, n in zip(cards, count)), deckName)
+                results.append((next(count), skipped, None))
+            except (OSError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile, tarfile.TarError, sqlite3.Error) as e:
+                results.append((0, skipped, str(e)))
+    finally:
+        for archive in archives.values():
+            archive.close()
+    return results
+
+def importDeckFiles(path, items):
+    #importCards into a csv directory, Deck.importDecks runs this in worker processes
+    return importCards(CsvStorage(path), items)
+
+def writeBinaryDeck(cards, path):
+    """
+    Writes cards to a binary deck: a header, length prefixed utf-8 fields for each card, then a table of where each
+    card starts. The table goes at the end so the cards can be streamed without knowing how many there are
+
+    Parameters
+    cards (iterable): The cards to write
+    path (str): Where to write the binary deck
+
+    Returns
+    int: The number of cards written
+    """
+    offsets = array("Q")
+    with open(path, "wb") as f:
+        f.write(bytes(BinaryDeck.HEADER.size)) #filled in once the count is known
+        position = BinaryDeck.HEADER.size
+        for card in cards:
+            offsets.append(position)
+            record = [BinaryDeck.ROW.pack(card.row)]
+            for field in (card.question, card.answer, card.date, card.deck or ""):
+                data = field.encode("utf-8")
+                record.append(BinaryDeck.LENGTH.pack(len(data)))
+                record.append(data)
+            record = b"".join(record)
+            f.write(record)
+            position += len(record)
+        padding = -position % 8 #keep the table 8 byte aligned
+        f.write(bytes(padding))
+        table_start = position + padding
+        offsets.tofile(f)
+        f.seek(0)
+        f.write(BinaryDeck.HEADER.pack(BinaryDeck.MAGIC, BinaryDeck.VERSION, 0, len(offsets), table_start))
+    return len(offsets)
+
+def csvToBinary(csv_path, binary_path, errors=None):
+    """
+    Converts a csv deck to the binary deck format
+
+    Parameters
+    csv_path (str): The csv deck to read
+    binary_path (str): Where to write the binary deck
+    errors (arr): Optional list that (line number, message) pairs are added to for every row that was skipped
+
+    Returns
+    int: The number of cards converted
+    """
+    return writeBinaryDeck(readCards(csv_path, errors), binary_path)
+
+def binaryToCsv(binary_path, csv_path):
+    """
+    Converts a binary deck back to a csv deck, the deck column is only written if a card has one. Rows that were left
+    blank when the deck was compacted are written blank again so every card keeps its row
+
+    Parameters
+    binary_path (str): The binary deck to read
+    csv_path (str): Where to write the csv deck
+
+    Returns
+    int: The number of cards converted
+    """
+    with BinaryDeck(binary_path) as deck:
+        has_deck = any(len(deck.fields(index)[4]) for index in range(len(deck)))
+        with open(csv_path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(deckHeader + ["deck"] if has_deck else deckHeader)
+            records = 1
+            for index in range(len(deck)):
+                row, *fields = deck.fields(index)
+                while records < row:
+                    w.writerow([])
+                    records += 1
+                question, answer, date, deck_name = (str(field, "utf-8") for field in fields)
+                w.writerow([question, answer, date, deck_name] if has_deck else [question, answer, date])
+                records += 1
+        return len(deck)
+
+def readJournal(path, errors=None):
+    """
+    Reads a deck's journal of changes, later changes to a row replace earlier ones. A batch of changes that was cut
+    short is left out as a whole, see batchRecord
 
-    pivot_index = random.randint(low, high)
-    ar[pivot_index], ar[high] = ar[high], ar[pivot_index]
-    pivot = getattr(ar[high], obj_func)
-
-    i = low - 1
-    for j in range(low, high):
-        if getattr(ar[j], obj_func) < pivot:
-            i += 1
-            ar[i], ar[j] = ar[j], ar[i]
-
-    # Place the pivot in its correct sorted position
-    ar[i + 1], ar[high] = ar[high], ar[i + 1]
-    partition_index = i + 1
-
-    quickSort(ar, low, partition_index - 1, obj_func)
-    quickSort(ar, partition_index + 1, high, obj_func)
-
-    return ar
-
-deck = Deck(directory)
-while True:
-    print(""
-          "1): Make Deck"
-          "\n2): Select Deck"
-          "\n3): Study Deck"
-          "\n4): Edit Deck"
-          "\n5): Export Deck"
-          "\n6): Import Deck"
-          "\n7): Exit"
-          )
-    menuChoice = input("Choose an option:\n")
-
-    if menuChoice == "7":
-        break
-    elif menuChoice == "1":
-        deck.makeDeck()
-    elif menuChoice == "2":
-        deck.selectDeck()
-        deck.extractDeck()
-    elif menuChoice == "3":
-        deck.studyDeck()
-    elif menuChoice == "4":
-        deck.editDeck()
-    elif menuChoice == "5":
-        deck.exportDeck()
-    elif menuChoice == "6":
-        deck.importDeck()
+    Parameters
+    path (str): The path to the journal
+    errors (arr): Optional list that (line number, message) pairs are added to for every entry that was skipped
+
+    Returns
+    dict: row -> (question, answer) for edited rows of the csv
+    set: Rows that were removed
+    dict: row -> (question, answer, date, deck) for added cards
+    """
+    edits, removed, added = {}, set(), {}
+    if not os.path.exists(path):
+        return edits, removed, added
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        for entry in reader:
+            found = [entry]
+            if entry[:1] == ["batch"]:
+                found = batchEntries(entry)
+                if found is None:
+                    if errors is not None:
+                        errors.append((reader.line_num, f"unfinished batch of changes in {os.path.basename(path)}"))
+                    continue
+            for found_entry in found:
+                try:
+                    applyJournalEntry(found_entry, edits, removed, added)
+                except (IndexError, ValueError):
+                    if errors is not None:
+                        errors.append((reader.line_num, f"bad journal entry in {os.path.basename(path)}"))
+    return edits, removed, added
+
+def batchRecord(entries):
+    #journal entries saved together as one journal line: "batch", the count, then each entry after its length, and
+    #"commit" last so a line a crash cut short can be told apart
+    record = ["batch", len(entries)]
+    for entry in entries:
+        record += [len(entry), *entry]
+    return record + ["commit"]
+
+def batchEntries(record):
+    #the journal entries of a batchRecord, None if it was cut short
+    try:
+        count, position, entries = int(record[1]), 2, []
+        for n in range(count):
+            length = int(record[position])
+            entries.append(record[position + 1:position + 1 + length])
+            position += 1 + length
+    except (IndexError, ValueError):
+        return None
+    return entries if record[position:] == ["commit"] else None
+
+def scheduleEntry(card):
+    #a card's saved scheduling numbers, in scheduleHeader order
+    return [card.row, card.due, card.interval, card.ease, card.repetitions, card.lapses, card.reviewed]
+
+def readSchedule(path):
+    """
+    Reads a deck's saved scheduling numbers, later lines for a row replace earlier ones
+
+    Parameters
+    path (str): The path to the schedule file
+
+    Returns
+    dict: row -> (due, interval, ease, repetitions, lapses, reviewed)
+    int: The number of lines in the file
+    """
+    schedule, lines = {}, 0
+    if not os.path.exists(path):
+        return schedule, lines
+    with open(path, "r", newline="") as f:
+        for entry in csv.reader(f):
+            lines += 1
+            try:
+                schedule[int(entry[0])] = (float(entry[1]), float(entry[2]), float(entry[3]), int(entry[4]), int(entry[5]),
+                                           float(entry[6]) if len(entry) > 6 else 0.0)
+            except (IndexError, ValueError):
+                continue #a line cut short by a crash, the card keeps what it had before
+    return schedule, lines
+
+def journalEntry(action, card):
+    #the journal entry for adding, editing or removing a card
+    if action == "add":
+        return ["add", card.row, card.question, card.answer, card.date, card.deck or ""]
+    if action == "edit":
+        return ["edit", card.row, card.question, card.answer]
+    return ["remove", card.row]
+
+def applyJournalEntry(entry, edits, removed, added):
+    """
+    Applies one journal entry ("add", "edit" or "remove" followed by the row and the card's fields) to the changes
+    read so far
+
+    Parameters
+    entry (arr): The journal entry
+    edits (dict): row -> (question, answer) for edited rows of the csv
+    removed (set): Rows that were removed
+    added (dict): row -> (question, answer, date, deck) for added cards
+
+    Returns
+    None
+    """
+    action, row = entry[0], int(entry[1])
+    if action == "add":
+        added[row] = (entry[2], entry[3], entry[4], entry[5] or None)
+    elif action == "edit" and row in added:
+        added[row] = (entry[2], entry[3]) + added[row][2:]
+    elif action == "edit":
+        edits[row] = (entry[2], entry[3])
+    elif action == "remove":
+        if added.pop(row, None) is None:
+            removed.add(row)
+            edits.pop(row, None)
     else:
-        print("Invalid Input!")
\ No newline at end of file
+        raise ValueError(action)
+
+def printCards(deck, start=0, count=None):
+    """
+    Print the cards information in a deck, or one page of it
+
+    Parameters
+    deck (arr): An array containing all cards in the deck
+    start (int): The index of the first card to print
+    count (int): How many cards to print, None for all of them
+
+    Returns
+    None
+    """
+    end = len(deck) if count is None else min(len(deck), start + count)
+    for n in range(start, end):
+        card = deck[n]
+        print(f"{n + 1}): Question): {card.question} Answer):{card.answer} Date Created): {card.date}")
+    print(f"{len(deck) + 1}): Back")
+
+def editDistance(a, b, limit):
+    """
+    Levenshtein distance between two strings that gives up once it is over a limit
+
+    Parameters
+    a (str): The first string
+    b (str): The second string
+    limit (int): The largest distance worth knowing
+
+    Returns
+    int: The distance, or limit + 1 if it is over the limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    #only cells within limit of the diagonal can be <= limit, everything outside the band counts as over the limit
+    over = limit + 1
+    previous = list(range(len(a) + 1))
+    for i, char_b in enumerate(b, 1):
+        low = max(1, i - limit)
+        high = min(len(a), i + limit)
+        current = [over] * (len(a) + 1)
+        current[0] = i if i <= limit else over
+        best = current[0]
+        for j in range(low, high + 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[j - 1] != char_b))
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+def dateKey(date):
+    """
+    Turns a card's date_created into a timestamp so dates compare by time instead of as text
+
+    Parameters
+    date (str): The date, "YYYY-MM-DD HH:MM:SS" as saved by makeCard
+
+    Returns
+    float: Seconds since the epoch, -inf for a date that can not be read so those cards sort first
+    """
+    try:
+        return dt.fromisoformat(date).timestamp()
+    except (TypeError, ValueError):
+        return float("-inf")
+
+def sortCards(cards, keys, collation="casefold"):
+    """
+    Sorts cards in place by one or more fields. Each field's key is worked out once per card,
+    and the cards are sorted one field at a time from the last to the first, which keeps ties
+    in the order the earlier fields put them in
+
+    Parameters
+    cards (arr): The cards to sort
+    keys (str or arr): A field or a list of fields out of "question", "answer" and "date",
+                       a field starting with "-" is sorted in descending order
+    collation (str): How question and answer text is compared, a key of sortCollations
+
+    Returns
+    arr: The same list, sorted
+    """
+    if isinstance(keys, str):
+        keys = [keys]
+    fold = sortCollations[collation]
+    for key in reversed(keys):
+        field = key.lstrip("-")
+        if field == "date":
+            sort_key = lambda card: dateKey(card.date)
+        elif field in ("question", "answer"):
+            get = operator.attrgetter(field)
+            sort_key = get if fold is None else lambda card: fold(get(card))
+        else:
+            raise ValueError(f"Can not sort cards by {key}")
+        cards.sort(key=sort_key, reverse=key.startswith("-"))
+    return cards
+
+def main():
+    try:
+        locale.setlocale(locale.LC_COLLATE, "") #the "locale" collation sorts the way the user's language does
+    except locale.Error:
+        pass #an unknown locale keeps the default, "locale" then sorts like "exact"
+    deck = Deck(directory, storage=SqliteStorage(database) if database else None, max_cards=maxCards,
+                pool_bytes=deckPoolBytes)
+    while True:
+        print(""
+              "1): Make Deck"
+              "\n2): Select Deck"
+              "\n3): Study Deck"
+              "\n4): Edit Deck"
+              "\n5): Export Deck"
+              "\n6): Import Deck"
+              "\n7): Exit"
+              "\n8): Study All Decks"
+              )
+        menuChoice = input("Choose an option:\n")
+
+        if menuChoice == "7":
+            deck.storage.close()
+            break
+        elif menuChoice == "1":
+            deck.makeDeck()
+        elif menuChoice == "2":
+            if deck.selectDeck() is not None and deck.extractDeck() is not None:
+                deck.printStatistics()
+        elif menuChoice == "3":
+            deck.studyDeck()
+        elif menuChoice == "4":
+            deck.editDeck()
+        elif menuChoice == "5":
+            deck.exportDeck()
+        elif menuChoice == "6":
+            deck.importDeck()
+        elif menuChoice == "8":
+            deck.studyAllDecks()
+        else:
+            print("Invalid Input!")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
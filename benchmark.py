@@ -0,0 +1,685 @@
+import argparse, csv, json, os, platform, random, shutil, sys, tempfile, time, tracemalloc
+from datetime import datetime as dt, timedelta
+
+from Flashcard import numpy, HashTable, ArrayHashTable, BinaryDeck, Card, CrossDeckSchedule, CsvStorage, Deck, PriorityQueue, \
+    csvToBinary, ReviewLog, SM2Scheduler, SortedView, SqliteStorage, readCards, scheduleEntry, sortCards
+
+#latency targets for a 10^6 card deck, in seconds. Study and edit are per answer/per edit, search is per lookup
+latencyTargets = {
+    "load": 20.0, #extractDeck: parse the csv, build the question index and the study queue
+    "search": 0.001, #exact question lookup in the hash table
+    "sort": 5.0, #Sort Cards by question
+    "study": 0.001, #show the next card and reschedule it
+    "edit": 0.005, #save an edited card and update the question index
+    "export": 20.0, #merge the journal and copy the deck out
+}
+
+def makeQuestions(n, seed=0):
+    """
+    Makes n unique lowercase questions shaped like the ones in test_decks
+
+    Parameters:
+    n (int): How many questions to make
+    seed (int): Seed for the random generator so runs are repeatable
+
+    Returns:
+    arr: A list of n question strings
+    """
+    rng = random.Random(seed)
+    words = ["what", "is", "the", "capital", "of", "largest", "planet", "who", "wrote", "painted",
+             "year", "did", "sink", "currency", "formula", "for", "area", "primary", "function", "water"]
+    return [" ".join(rng.choice(words) for _ in range(6)) + f" {i}?" for i in range(n)]
+
+def writeDeck(path, n, seed=0):
+    """
+    Writes a synthetic deck shaped like test_decks/Deck1.csv, including a quoted question with a comma in it
+
+    Parameters:
+    path (str): Where to write the csv
+    n (int): How many cards to write
+    seed (int): Seed for the random generator so runs are repeatable
+
+    Returns:
+    None
+    """
+    deck_name = os.path.splitext(os.path.basename(path))[0]
+    first_date = dt(2023, 10, 27, 10)
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["question", "answer", "date_created", "deck"])
+        for n, question in enumerate(makeQuestions(n, seed)):
+            if n % 10 == 0:
+                question = f'Who wrote "{question}", and when?'
+            #cards made a random number of seconds apart, shuffled a little so the file isn't already sorted by date
+            date = first_date + timedelta(seconds=n * 60 + rng.randrange(-90, 90))
+            w.writerow([question, f"answer {rng.randrange(10 ** 6)}", str(date), deck_name])
+
+def measureTable(table_class, questions):
+    """
+    Times insert/get/delete and measures the memory a hash table type uses for a set of questions
+
+    Parameters:
+    table_class (class): HashTable or ArrayHashTable
+    questions (arr): The keys to insert
+
+    Returns:
+    dict: Memory in bytes and per operation latency in nanoseconds
+    """
+    cards = [Card(q, "answer", "2023-10-27 10:00:00", n) for n, q in enumerate(questions, 1)]
+
+    #memory is measured on a separate build since tracemalloc slows every allocation down
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = table_class()
+    for q, card in zip(questions, cards):
+        table.insert(q, card)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del table
+
+    start = time.perf_counter()
+    table = table_class()
+    for q, card in zip(questions, cards):
+        table.insert(q, card)
+    insert_time = time.perf_counter() - start
+
+    lookups = questions[:]
+    random.Random(1).shuffle(lookups)
+    start = time.perf_counter()
+    for q in lookups:
+        table.get(q)
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for q in lookups:
+        table.delete(q)
+    delete_time = time.perf_counter() - start
+
+    n = len(questions)
+    return {
+        "memory_bytes": memory,
+        "bytes_per_entry": memory / n,
+        "insert_ns": insert_time / n * 1e9,
+        "get_ns": get_time / n * 1e9,
+        "delete_ns": delete_time / n * 1e9,
+    }
+
+def compareHashTables(sizes=(1000, 10000, 100000)):
+    """
+    Prints a memory/latency comparison of the tuple layout (HashTable) against the array layout (ArrayHashTable)
+
+    Parameters:
+    sizes (tuple): The number of questions to test with
+
+    Returns:
+    None
+    """
+    print(f"{'layout':<16}{'cards':>10}{'bytes/card':>12}{'insert ns':>12}{'get ns':>10}{'delete ns':>12}")
+    for n in sizes:
+        questions = makeQuestions(n)
+        for table_class in (HashTable, ArrayHashTable):
+            r = measureTable(table_class, questions)
+            print(f"{table_class.__name__:<16}{n:>10}{r['bytes_per_entry']:>12.1f}"
+                  f"{r['insert_ns']:>12.0f}{r['get_ns']:>10.0f}{r['delete_ns']:>12.0f}")
+
+def measureLoad(sizes=(10000, 100000, 1000000)):
+    """
+    Prints how many rows per second readCards parses and extractDeck loads into a Deck
+
+    Parameters:
+    sizes (tuple): The number of cards in each generated deck
+
+    Returns:
+    None
+    """
+    print(f"{'cards':>10}{'MB':>8}{'readCards rows/s':>18}{'extractDeck rows/s':>20}")
+    with tempfile.TemporaryDirectory() as folder:
+        for n in sizes:
+            path = os.path.join(folder, f"Bench{n}.csv")
+            writeDeck(path, n)
+            megabytes = os.path.getsize(path) / 1e6
+
+            start = time.perf_counter()
+            for card in readCards(path):
+                pass
+            parse_time = time.perf_counter() - start
+
+            deck = Deck(folder + os.sep)
+            deck.deckName = os.path.basename(path)
+            start = time.perf_counter()
+            deck.extractDeck()
+            load_time = time.perf_counter() - start
+            print(f"{n:>10}{megabytes:>8.1f}{n / parse_time:>18.0f}{n / load_time:>20.0f}")
+
+def measureBinary(sizes=(10000, 100000, 1000000)):
+    """
+    Prints how long it takes to open a binary deck and read random cards from it, compared to parsing the csv
+
+    Parameters:
+    sizes (tuple): The number of cards in each generated deck
+
+    Returns:
+    None
+    """
+    print(f"{'cards':>10}{'csv parse ms':>14}{'binary open ms':>16}{'random card us':>16}")
+    with tempfile.TemporaryDirectory() as folder:
+        for n in sizes:
+            csv_path = os.path.join(folder, f"Bench{n}.csv")
+            binary_path = os.path.join(folder, f"Bench{n}.fcd")
+            writeDeck(csv_path, n)
+            csvToBinary(csv_path, binary_path)
+
+            start = time.perf_counter()
+            cards = list(readCards(csv_path))
+            parse_time = time.perf_counter() - start
+            del cards
+
+            start = time.perf_counter()
+            deck = BinaryDeck(binary_path)
+            open_time = time.perf_counter() - start
+
+            picks = [random.randrange(n) for _ in range(10000)]
+            start = time.perf_counter()
+            for index in picks:
+                deck[index]
+            access_time = time.perf_counter() - start
+            deck.close()
+            print(f"{n:>10}{parse_time * 1e3:>14.1f}{open_time * 1e3:>16.3f}{access_time / len(picks) * 1e6:>16.2f}")
+
+def measureDecks(sizes=(100000,), count=8):
+    """
+    Prints how long it takes to load many decks one after another with extractDeck and at once with loadDecks, for
+    every number of processes up to the number of cores
+
+    Parameters:
+    sizes (tuple): The number of cards in each generated deck
+    count (int): How many decks to load
+
+    Returns:
+    None
+    """
+    print(f"{'cards':>10}{'decks':>7}{'processes':>11}{'seconds':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            names = [f"Bench{i}.csv" for i in range(count)]
+            for i, name in enumerate(names):
+                writeDeck(os.path.join(folder, name), n, seed=i)
+            deck = Deck(folder + os.sep)
+
+            start = time.perf_counter()
+            for name in names:
+                deck.deckName = name
+                deck.extractDeck()
+            print(f"{n:>10}{count:>7}{'serial':>11}{time.perf_counter() - start:>10.2f}")
+            for processes in range(1, (os.cpu_count() or 1) + 1):
+                start = time.perf_counter()
+                deck.loadDecks(names, processes=processes)
+                print(f"{n:>10}{count:>7}{processes:>11}{time.perf_counter() - start:>10.2f}")
+
+def measureImport(sizes=(1000,), count=200):
+    """
+    Prints how long importDecks takes to import many decks from a directory and from a zip archive, for every number
+    of processes up to the number of cores
+
+    Parameters:
+    sizes (tuple): The number of cards in each generated deck
+    count (int): How many decks to import
+
+    Returns:
+    None
+    """
+    print(f"{'cards':>10}{'decks':>7}{'source':>8}{'processes':>11}{'seconds':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "source")
+            os.mkdir(source)
+            for i in range(count):
+                writeDeck(os.path.join(source, f"Shared{i}.csv"), n, seed=i)
+            archive = shutil.make_archive(os.path.join(folder, "shared"), "zip", source)
+            for label, pattern in (("dir", source), ("zip", archive)):
+                for processes in range(1, (os.cpu_count() or 1) + 1):
+                    target = os.path.join(folder, f"{label}{processes}")
+                    os.mkdir(target)
+                    start = time.perf_counter()
+                    Deck(target + os.sep).importDecks(pattern, processes=processes)
+                    print(f"{n:>10}{count:>7}{label:>8}{processes:>11}{time.perf_counter() - start:>10.2f}")
+
+def quickSort(ar, low, high, obj_func):
+    """
+    The recursive quicksort Flashcard.py used before sortCards, kept to compare against
+    """
+    if low >= high:
+        return
+
+    pivot_index = random.randint(low, high)
+    ar[pivot_index], ar[high] = ar[high], ar[pivot_index]
+    pivot = getattr(ar[high], obj_func)
+
+    i = low - 1
+    for j in range(low, high):
+        if getattr(ar[j], obj_func) < pivot:
+            i += 1
+            ar[i], ar[j] = ar[j], ar[i]
+
+    # Place the pivot in its correct sorted position
+    ar[i + 1], ar[high] = ar[high], ar[i + 1]
+    partition_index = i + 1
+
+    quickSort(ar, low, partition_index - 1, obj_func)
+    quickSort(ar, partition_index + 1, high, obj_func)
+
+    return ar
+
+def measureSort(sizes=(10000, 100000, 1000000)):
+    """
+    Times the old quickSort against sortCards on each field, and sortCards on several fields at once
+
+    Parameters:
+    sizes (tuple): The deck sizes to test
+
+    Returns:
+    None
+    """
+    print(f"{'cards':>9}{'key':>14}{'quickSort':>12}{'sortCards':>12}{'speedup':>9}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            writeDeck(os.path.join(folder, "Sort.csv"), n)
+            cards = list(readCards(os.path.join(folder, "Sort.csv")))
+        for key in ("question", "answer", "date"):
+            shuffled = list(cards)
+            random.shuffle(shuffled)
+            old = list(shuffled)
+            start = time.perf_counter()
+            quickSort(old, 0, len(old) - 1, key)
+            old_seconds = time.perf_counter() - start
+            new = list(shuffled)
+            start = time.perf_counter()
+            sortCards(new, key)
+            new_seconds = time.perf_counter() - start
+            print(f"{n:>9}{key:>14}{old_seconds:>12.3f}{new_seconds:>12.3f}{old_seconds / new_seconds:>8.1f}x")
+        shuffled = list(cards)
+        random.shuffle(shuffled)
+        start = time.perf_counter()
+        sortCards(shuffled, ["answer", "-date"])
+        print(f"{n:>9}{'answer,-date':>14}{'':>12}{time.perf_counter() - start:>12.3f}")
+
+def measureScale(n=1000000):
+    """
+    Times every step a user goes through on one big deck and checks it against latencyTargets.
+    The targets are for 10^6 cards, smaller decks are checked against the same numbers
+
+    Parameters:
+    n (int): The number of cards in the generated deck
+
+    Returns:
+    dict: The measured seconds for each step
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        writeDeck(os.path.join(folder, "Scale.csv"), n)
+        deck = Deck(folder + os.sep)
+        deck.deckName = "Scale.csv"
+
+        start = time.perf_counter()
+        deck.extractDeck()
+        results["load"] = time.perf_counter() - start
+
+        picks = [deck.deck[random.randrange(n)].question.lower() for _ in range(10000)]
+        start = time.perf_counter()
+        for question in picks:
+            deck.hash_table.get(question)
+        results["search"] = (time.perf_counter() - start) / len(picks)
+
+        start = time.perf_counter()
+        deck.sortDeck("question")
+        results["sort"] = time.perf_counter() - start
+
+        answers = min(10000, n) #each card is answered "good" once, after that none is due
+        now = time.time()
+        start = time.perf_counter()
+        for i in range(answers):
+            card = deck.study_deck.nextCard(now)
+            deck.study_deck.reviewCard(card, "good", now)
+            deck.storage.updateSchedule(deck.deckName, [scheduleEntry(card)])
+        results["study"] = (time.perf_counter() - start) / answers
+
+        edits = 1000
+        start = time.perf_counter()
+        for i in range(edits):
+            card = deck.deck[random.randrange(n)]
+            old_question = card.question
+            card.question = f"Edited {i}?"
+            deck.storage.updateCard(deck.deckName, card)
+            deck.reindexCard(card, old_question)
+        results["edit"] = (time.perf_counter() - start) / edits
+
+        export_folder = os.path.join(folder, "export")
+        os.mkdir(export_folder)
+        start = time.perf_counter()
+        deck.storage.exportDeck(deck.deckName, export_folder)
+        results["export"] = time.perf_counter() - start
+        deck.storage.close()
+
+    print(f"{'step':<8}{'seconds':>12}{'target':>10}")
+    for step, seconds in results.items():
+        target = latencyTargets[step]
+        print(f"{step:<8}{seconds:>12.6f}{target:>10}  {'ok' if seconds <= target else 'SLOW'}")
+    return results
+
+def timeBest(func, repeat):
+    #best of repeat runs, the least disturbed run is the most repeatable number
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def suiteHashTable(results, n, repeat):
+    """
+    Times HashTable insert/get/delete per operation at several load factors, then get after deleting part of the
+    table. Shrinking is turned off for the deleted runs so the deleted markers stay in the table
+
+    Parameters:
+    results (dict): Where to store the timings
+    n (int): The number of keys
+    repeat (int): How many times to run each timing
+
+    Returns:
+    None
+    """
+    questions = makeQuestions(n)
+    missing = [question + " missing" for question in questions[:n // 2]]
+    for load_factor in (0.5, 0.7, 0.9):
+        def insert():
+            table = HashTable(load_factor=load_factor)
+            for question in questions:
+                table.insert(question, None)
+        results[f"hashtable.insert/n={n}/load={load_factor}"] = timeBest(insert, repeat) / n
+
+        table = HashTable(load_factor=load_factor)
+        for question in questions:
+            table.insert(question, None)
+        results[f"hashtable.get/n={n}/load={load_factor}"] = timeBest(lambda: [table.get(q) for q in questions], repeat) / n
+        results[f"hashtable.get_missing/n={n}/load={load_factor}"] = \
+            timeBest(lambda: [table.get(q) for q in missing], repeat) / len(missing)
+
+        def delete():
+            copy = HashTable(load_factor=load_factor)
+            copy.table, copy.size, copy.count = list(table.table), table.size, table.count
+            start = time.perf_counter()
+            for question in questions:
+                copy.delete(question)
+            return time.perf_counter() - start
+        results[f"hashtable.delete/n={n}/load={load_factor}"] = min(delete() for _ in range(repeat)) / n
+
+    for ratio in (0.25, 0.5):
+        table = HashTable(min_load_factor=0)
+        for question in questions:
+            table.insert(question, None)
+        for question in questions[:int(n * ratio)]:
+            table.delete(question)
+        kept = questions[int(n * ratio):]
+        results[f"hashtable.get/n={n}/tombstones={ratio}"] = timeBest(lambda: [table.get(q) for q in kept], repeat) / len(kept)
+        results[f"hashtable.get_missing/n={n}/tombstones={ratio}"] = \
+            timeBest(lambda: [table.get(q) for q in missing], repeat) / len(missing)
+
+def suitePriorityQueue(results, n, repeat):
+    rng = random.Random(0)
+    priorities = [rng.randrange(1, 11) for _ in range(n)]
+    cards = [Card("q", "a", "d", row) for row in range(n)]
+
+    updates = [(cards[rng.randrange(n)].row, rng.randrange(1, 11)) for _ in range(min(n, 10000))]
+
+    def run():
+        queue = PriorityQueue(key=lambda card: card.row)
+        start = time.perf_counter()
+        for priority, card in zip(priorities, cards):
+            queue.enqueue(priority, card)
+        enqueued = time.perf_counter()
+        for row, priority in updates:
+            queue.updatePriority(row, priority)
+        updated = time.perf_counter()
+        while not queue.isEmpty():
+            queue.dequeue()
+        return enqueued - start, updated - enqueued, time.perf_counter() - updated
+    runs = [run() for _ in range(repeat)]
+    results[f"priorityqueue.enqueue/n={n}"] = min(r[0] for r in runs) / n
+    results[f"priorityqueue.updatePriority/n={n}"] = min(r[1] for r in runs) / len(updates)
+    results[f"priorityqueue.dequeue/n={n}"] = min(r[2] for r in runs) / n
+
+def suiteDeck(results, n, repeat, folder):
+    """
+    Times parsing a generated deck with extractDeck and taking it back out of the deck pool, quickSort and sortCards on each key, keeping a SortedView up to date, card store queries, rescheduling, review log replay, starting a study session over every deck in SQLite and csv, saving an edited card and listing the decks
+
+    Parameters:
+    results (dict): Where to store the timings
+    n (int): The number of cards
+    repeat (int): How many times to run each timing
+    folder (str): A temporary directory to write decks to
+
+    Returns:
+    None
+    """
+    name = f"Suite{n}.csv"
+    writeDeck(os.path.join(folder, name), n)
+    deck = Deck(folder + os.sep)
+    deck.deckName = name
+    results[f"extractDeck/n={n}"] = timeBest(lambda: deck.extractDeck(reuse=False), repeat)
+    #selecting a deck again takes it back out of the deck pool
+    other = f"Other{n}.csv"
+    writeDeck(os.path.join(folder, other), 10)
+    pooled = Deck(folder + os.sep, pool_bytes=1 << 40)
+    pooled.deckName = name
+    pooled.extractDeck()
+    def switchBack():
+        pooled.deckName = other
+        pooled.extractDeck()
+        pooled.deckName = name
+        start = time.perf_counter()
+        pooled.extractDeck()
+        return time.perf_counter() - start
+    results[f"extractDeck.pooled/n={n}"] = min(switchBack() for _ in range(repeat))
+
+    for key in ("question", "answer", "date"):
+        def sort():
+            cards = list(deck.deck)
+            start = time.perf_counter()
+            quickSort(cards, 0, len(cards) - 1, key)
+            return time.perf_counter() - start
+        results[f"quickSort/n={n}/key={key}"] = min(sort() for _ in range(repeat))
+
+        def sortNew():
+            cards = list(deck.deck)
+            start = time.perf_counter()
+            sortCards(cards, key)
+            return time.perf_counter() - start
+        results[f"sortCards/n={n}/key={key}"] = min(sortNew() for _ in range(repeat))
+
+    #whole deck questions answered from the card store's columns, against asking every Card
+    now = time.time()
+    results[f"cardStore.dueCards/n={n}"] = timeBest(lambda: deck.store.dueCards(now), repeat)
+    results[f"cardStore.statistics/n={n}"] = timeBest(lambda: deck.store.statistics(now), repeat)
+    results[f"cards.statistics/n={n}"] = timeBest(
+        lambda: (sum(1 for card in deck.deck if card.due <= now), sum(card.ease for card in deck.deck) / n), repeat)
+
+    #every card answered in one pass, then every due time worked out again for new settings and the queue rebuilt
+    scheduler = SM2Scheduler()
+    indexes = list(range(n))
+    quality = [random.Random(i).choice((1, 3, 4, 5)) for i in indexes]
+    results[f"cardStore.reviewCards/n={n}"] = timeBest(
+        lambda: deck.store.reviewCards(scheduler, indexes, quality, now), repeat)
+    results[f"rescheduleDeck/n={n}"] = timeBest(
+        lambda: deck.rescheduleDeck(SM2Scheduler(interval_modifier=1.5)), repeat)
+
+    #two answers per card on average written to a review log, then read back and replayed into the card store
+    log = ReviewLog(os.path.join(folder, name + ".reviews"))
+    if os.path.exists(log.path):
+        os.remove(log.path)
+    rng = random.Random(0)
+    log.appendMany((deck.deck[rng.randrange(n)].row, now + i, rng.choice((1, 3, 4, 5)), 1.0, 6.0, 2.5)
+                   for i in range(2 * n))
+    results[f"reviewLog.read/n={n}"] = timeBest(log.read, repeat)
+    reviews = log.read()
+    results[f"cardStore.replayReviews/n={n}"] = timeBest(lambda: deck.store.replayReviews(reviews, scheduler), repeat)
+
+    #a sorted view is built once, after that every add or edit keeps it sorted
+    results[f"sortedView.build/n={n}"] = timeBest(lambda: SortedView("question", deck.deck), repeat)
+    view = SortedView("question", deck.deck)
+    added = [Card(f"Added {i}?", "Answer", "2024-01-01 00:00:00", n + 1 + i) for i in range(1000)]
+    def update():
+        for card in added:
+            view.addCard(card)
+        for card in added:
+            view.removeCard(card)
+    results[f"sortedView.add+remove/n={n}"] = timeBest(update, repeat) / len(added)
+
+    #a session over every deck only reads the due cards, here 100 of the n in a SQLite deck
+    sqlite = SqliteStorage(os.path.join(folder, f"Suite{n}.db"))
+    sqlite.writeDeck(name, deck.deck)
+    sqlite.updateSchedule(name, ([card.row, now - 1 if i < 100 else now + 86400, 1.0, 2.5, 1, 0, now]
+                                 for i, card in enumerate(deck.deck)))
+    results[f"crossDeck.start/n={n}/due=100"] = timeBest(lambda: CrossDeckSchedule(sqlite, now).nextCard(now), repeat)
+    sqlite.close()
+    #the same deck in csv files, and again with nothing due where the deck catalog leaves it unread
+    csv_folder = os.path.join(folder, f"cross{n}")
+    os.makedirs(csv_folder, exist_ok=True)
+    csv_storage = CsvStorage(csv_folder)
+    csv_storage.writeDeck(name, deck.deck)
+    csv_storage.updateSchedule(name, ([card.row, now - 1 if i < 100 else now + 86400, 1.0, 2.5, 1, 0, now]
+                                      for i, card in enumerate(deck.deck)))
+    csv_storage.deckInfo(now) #the catalog is brought up to date once, not on every run
+    results[f"crossDeck.csv.start/n={n}/due=100"] = timeBest(
+        lambda: CrossDeckSchedule(csv_storage, now).nextCard(now), repeat)
+    csv_storage.updateSchedule(name, ([card.row, now + 86400, 1.0, 2.5, 1, 0, now] for card in deck.deck[:100]))
+    csv_storage.deckInfo(now)
+    results[f"crossDeck.csv.start/n={n}/due=0"] = timeBest(
+        lambda: CrossDeckSchedule(csv_storage, now).nextCard(now), repeat)
+
+    #editCard saves through the storage: an append to the journal, and now and then a rewrite of the whole csv
+    storage = CsvStorage(folder + os.sep, journal_limit=float("inf"))
+    cards = [deck.deck[random.Random(i).randrange(n)] for i in range(1000)]
+    def edit():
+        for card in cards:
+            storage.updateCard(name, card)
+    results[f"editCard.journal/n={n}"] = timeBest(edit, repeat) / len(cards)
+    def rewrite():
+        storage.updateCard(name, cards[0])
+        start = time.perf_counter()
+        storage.compactDeck(name)
+        return time.perf_counter() - start
+    results[f"editCard.rewrite/n={n}"] = min(rewrite() for _ in range(repeat))
+
+    #listing the decks with their counts reads a deck again only when one of its files changed
+    storage.waitForCompaction()
+    storage.deckInfo()
+    results[f"deckInfo.unchanged/n={n}"] = timeBest(storage.deckInfo, repeat)
+
+def runSuite(sizes=(1000, 10000, 100000), repeat=3):
+    """
+    Runs every benchmark at every size
+
+    Parameters:
+    sizes (tuple): The number of cards/keys to test with
+    repeat (int): How many times to run each timing, the best run is kept
+
+    Returns:
+    dict: The environment the suite ran in and the seconds (per operation where it says so) for every benchmark
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for n in sizes:
+            print(f"Running n={n}", file=sys.stderr)
+            suiteHashTable(results, n, repeat)
+            suitePriorityQueue(results, n, repeat)
+            suiteDeck(results, n, repeat, folder)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+        "date": str(dt.now())[:19],
+        "sizes": list(sizes),
+        "repeat": repeat,
+        "results": results,
+    }
+
+def compareResults(baseline, current, threshold=0.2):
+    """
+    Prints every benchmark next to a stored baseline and flags the ones that got slower by more than a threshold
+
+    Parameters:
+    baseline (dict): Results from an earlier runSuite
+    current (dict): Results from runSuite
+    threshold (float): The allowed slowdown, 0.2 means 20% slower
+
+    Returns:
+    arr: The names of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"{'benchmark':<50}{'baseline':>14}{'current':>14}{'change':>9}")
+    for name, seconds in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<50}{'':>14}{seconds:>14.3e}{'new':>9}")
+            continue
+        change = seconds / before - 1 if before else 0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<50}{before:>14.3e}{seconds:>14.3e}{change:>+9.1%}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for Flashcard.py")
+    parser.add_argument("benchmark", choices=["tables", "load", "decks", "import", "binary", "sort", "scale",
+                                              "suite", "compare"],
+                        help="tables: HashTable vs ArrayHashTable, load: csv loading, "
+                             "decks: many decks loaded serially and in a process pool, "
+                             "import: many decks imported from a directory and a zip, binary: binary deck access, "
+                             "sort: quickSort against sortCards, "
+                             "scale: every step on one big deck against the latency targets, "
+                             "suite: every benchmark written as json, compare: two suite json files")
+    parser.add_argument("sizes", nargs="*", help="number of cards to test with, or the baseline and current json "
+                                                 "files for compare")
+    parser.add_argument("--output", help="suite: where to write the json results")
+    parser.add_argument("--baseline", help="suite: json results to compare against once the suite is done")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown flagged as a regression (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=3, help="suite: runs per benchmark, the best is kept")
+    args = parser.parse_args()
+    if args.benchmark == "compare":
+        if len(args.sizes) != 2:
+            parser.error("compare needs a baseline and a current json file")
+        with open(args.sizes[0]) as f:
+            baseline = json.load(f)
+        with open(args.sizes[1]) as f:
+            current = json.load(f)
+        sys.exit(1 if compareResults(baseline, current, args.threshold) else 0)
+    args.sizes = [int(n) for n in args.sizes]
+    if args.benchmark == "suite":
+        results = runSuite(tuple(args.sizes) or (1000, 10000, 100000), args.repeat)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        if args.baseline:
+            with open(args.baseline) as f:
+                sys.exit(1 if compareResults(json.load(f), results, args.threshold) else 0)
+    elif args.benchmark == "tables":
+        compareHashTables(tuple(args.sizes) or (1000, 10000, 100000))
+    elif args.benchmark == "load":
+        measureLoad(tuple(args.sizes) or (10000, 100000, 1000000))
+    elif args.benchmark == "decks":
+        measureDecks(tuple(args.sizes) or (100000,))
+    elif args.benchmark == "import":
+        measureImport(tuple(args.sizes) or (1000,))
+    elif args.benchmark == "binary":
+        measureBinary(tuple(args.sizes) or (10000, 100000, 1000000))
+    elif args.benchmark == "sort":
+        measureSort(tuple(args.sizes) or (10000, 100000, 1000000))
+    else:
+        measureScale(args.sizes[0] if args.sizes else 1000000)
@@ -0,0 +1,12 @@
+import sys
+
+from Flashcard import migrateCsvDirectory
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python migrate.py <csv deck directory> <database file>")
+        sys.exit(1)
+    loaded = migrateCsvDirectory(sys.argv[1], sys.argv[2])
+    for name, count in loaded.items():
+        print(f"{name}: {count} cards")
+    print(f"Migrated {len(loaded)} decks into {sys.argv[2]}")